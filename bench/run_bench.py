@@ -0,0 +1,277 @@
+# bench/run_bench.py
+"""
+End-to-end benchmark: generate data -> build_and_index -> ask N questions.
+
+Everything runs locally: a synthetic database (bench/datagen.py), the
+deterministic stub LLM (bench/stub_llm.py) and a throwaway Chroma dir.
+Results are written to bench/results/<name>.json and compared against
+bench/baselines/<name>.json; the exit code is 1 on regression.
+
+    python -m bench.run_bench --name small --tables 10 --rows 10000
+    python -m bench.run_bench --name small --save-baseline
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+# metric -> True if higher is better
+METRICS = {
+    "ask_qps": True,
+    "ask_p50_s": False,
+    "ask_p99_s": False,
+    "build_s": False,
+    "embed_chunks_per_s": True,
+    "build_peak_rss_mb": False,
+    "build_tree_peak_rss_mb": False,
+    "ask_peak_rss_mb": False,
+}
+
+
+def _reset_peak_rss() -> bool:
+    """Resets the process high-water mark (Linux) so each phase reports its own peak."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # no per-phase reset here: ru_maxrss is the peak since process start (KiB on Linux, bytes on macOS)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _tree_rss_mb(pid: int) -> float:
+    """VmRSS of `pid` plus all its descendants (Linux /proc); 0.0 elsewhere."""
+    total, stack = 0.0, [pid]
+    while stack:
+        p = stack.pop()
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) / 1024
+            for tid in os.listdir(f"/proc/{p}/task"):
+                with open(f"/proc/{p}/task/{tid}/children") as f:
+                    stack += [int(c) for c in f.read().split()]
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+class TreeRssSampler:
+    """Samples the RSS of this process and its children (e.g. encoder workers) in the background."""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _tree_rss_mb(os.getpid()))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _generate(args):
+    """Runs datagen in a child process so its memory does not count towards the build/ask peaks."""
+    cmd = [
+        sys.executable, "-m", "bench.datagen", "--db-uri", args.db_uri, "--tables", str(args.tables),
+        "--rows", str(args.rows), "--cols", str(args.cols), "--seed", str(args.seed),
+    ]
+    subprocess.run(cmd, cwd=REPO_DIR, check=True)
+
+
+def _configure_env(args, work_dir: str, llm_url: str):
+    """Must run before any `src` import: those modules read config at import time."""
+    os.environ["DB_URI"] = args.db_uri
+    os.environ["DB_NAME"] = args.db_name
+    os.environ["OPENAI_BASE_URL"] = llm_url
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["LLM_MODEL"] = "stub"
+    os.environ["CHROMA_DIR"] = os.path.join(work_dir, "chroma")
+    os.environ["QUERY_LOG_PATH"] = os.path.join(work_dir, "query_log.jsonl")
+    os.environ["STATS_PATH"] = os.path.join(work_dir, "column_stats.json")
+    os.environ["WATCH_SNAPSHOT_PATH"] = os.path.join(work_dir, "schema_snapshot.json")
+    os.environ["EXAMPLES_AUTO_ADD"] = "0"
+    os.environ["TRACING_BACKEND"] = "local"
+    os.environ["EMBED_PROCESSES"] = str(args.embed_processes)
+
+
+def run(args) -> dict:
+    from bench.datagen import sample_questions
+    from bench.stub_llm import start_stub
+
+    if not args.skip_gen:
+        _generate(args)
+
+    server, llm_url = start_stub(latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms, seed=args.seed)
+    work_dir = tempfile.mkdtemp(prefix="nl2sql_bench_")
+    _configure_env(args, work_dir, llm_url)
+
+    from src import tracing
+    from src.run_full_pipeline import build_and_index
+    from src.rag_query import question_to_sql_and_execute
+
+    # --- build ---------------------------------------------------------
+    tracing.reset_local()
+    build_reset = _reset_peak_rss()
+    t0 = time.perf_counter()
+    with TreeRssSampler() as tree_rss:
+        res = build_and_index(args.sample_n)
+    build_s = time.perf_counter() - t0
+    # without a reset the high-water mark covers the whole process lifetime: not a phase metric
+    build_rss = round(_peak_rss_mb(), 1) if build_reset else None
+    build_stages = tracing.stage_percentiles()
+    embed_total = tracing.stage_total("index_embed")
+    chunks = (res or {}).get("count", 0)
+
+    # --- ask -----------------------------------------------------------
+    tracing.reset_local()
+    ask_reset = _reset_peak_rss()
+    questions = sample_questions(args.tables, args.questions, seed=args.seed)
+    latencies, errors = [], 0
+
+    def ask_one(q):
+        t = time.perf_counter()
+        try:
+            question_to_sql_and_execute(q, run_query=True)
+            return time.perf_counter() - t, None
+        except Exception as e:
+            return time.perf_counter() - t, e
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for elapsed, err in pool.map(ask_one, questions):
+            latencies.append(elapsed)
+            if err is not None:
+                errors += 1
+    ask_s = time.perf_counter() - t0
+    server.shutdown()
+
+    return {
+        "name": args.name,
+        "config": {
+            "db_uri": args.db_uri, "tables": args.tables, "rows": args.rows, "cols": args.cols,
+            "questions": args.questions, "concurrency": args.concurrency,
+            "llm_latency_ms": args.llm_latency_ms, "sample_n": args.sample_n,
+            "embed_processes": args.embed_processes,
+        },
+        "metrics": {
+            "build_s": round(build_s, 3),
+            "embed_chunks_per_s": round(chunks / embed_total, 2) if embed_total else 0.0,
+            "ask_qps": round(len(questions) / ask_s, 3) if ask_s else 0.0,
+            "ask_p50_s": round(tracing.percentile(latencies, 50), 4),
+            "ask_p99_s": round(tracing.percentile(latencies, 99), 4),
+            "ask_errors": errors,
+            "build_peak_rss_mb": build_rss,
+            "build_tree_peak_rss_mb": round(tree_rss.peak, 1) or None,  # 0.0 without /proc
+            "ask_peak_rss_mb": round(_peak_rss_mb(), 1) if ask_reset else None,
+        },
+        "build_stages": build_stages,
+        "ask_stages": tracing.stage_percentiles(),
+        "counters": tracing.counters(),
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float):
+    """Returns a list of human-readable regressions beyond `tolerance` (fraction)."""
+    regressions = []
+    for metric, higher_is_better in METRICS.items():
+        cur = result["metrics"].get(metric)
+        base = baseline["metrics"].get(metric)
+        if not cur or not base:
+            continue  # missing, or not measurable on this platform (None)
+        change = (cur - base) / base
+        worse = -change if higher_is_better else change
+        status = "❌" if worse > tolerance else "✅"
+        print(f"   {status} {metric:<20} {base:>10} -> {cur:<10} ({change:+.1%})")
+        if worse > tolerance:
+            regressions.append(f"{metric}: {base} -> {cur} ({change:+.1%})")
+    return regressions
+
+
+def _print_result(result: dict):
+    m = result["metrics"]
+    print(f"\n📊 Benchmark '{result['name']}'")
+    print(f"   build {m['build_s']}s  embed {m['embed_chunks_per_s']} chunks/s  peak RSS {m['build_peak_rss_mb'] or 'n/a'} MB"
+          f" (incl. workers {m['build_tree_peak_rss_mb'] or 'n/a'} MB)")
+    print(f"   ask   {m['ask_qps']} q/s  p50 {m['ask_p50_s']}s  p99 {m['ask_p99_s']}s  errors {m['ask_errors']}"
+          f"  peak RSS {m['ask_peak_rss_mb'] or 'n/a'} MB")
+    for phase in ("build_stages", "ask_stages"):
+        print(f"   {phase}:")
+        for stage, st in result[phase].items():
+            print(f"   - {stage:<16} p50={st['p50'] * 1000:8.2f}ms p99={st['p99'] * 1000:8.2f}ms n={st['n']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end NL2SQL benchmark")
+    parser.add_argument("--name", default="default", help="Result/baseline name")
+    parser.add_argument("--db-uri", default=f"sqlite:///{os.path.join(BENCH_DIR, '.data', 'bench.db')}")
+    parser.add_argument("--db-name", default="bench", help="Used for the Chroma collection name")
+    parser.add_argument("--tables", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=1000, help="Total rows across all tables")
+    parser.add_argument("--cols", type=int, default=6)
+    parser.add_argument("--skip-gen", action="store_true", help="Reuse the existing database")
+    parser.add_argument("--sample_n", type=int, default=5)
+    parser.add_argument("--embed-processes", type=int, default=1, help="EMBED_PROCESSES for the build")
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed regression as a fraction")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    result = run(args)
+    _print_result(result)
+
+    os.makedirs(os.path.join(BENCH_DIR, "results"), exist_ok=True)
+    with open(os.path.join(BENCH_DIR, "results", f"{args.name}.json"), "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+    baseline_path = os.path.join(BENCH_DIR, "baselines", f"{args.name}.json")
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Saved baseline {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\n🔁 Comparing against {baseline_path} (tolerance {args.tolerance:.0%})")
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print("❌ Performance regressions:\n - " + "\n - ".join(regressions))
+            sys.exit(1)
+        print("✅ No regressions.")
+    else:
+        print(f"ℹ️  No baseline at {baseline_path}; run with --save-baseline to create one.")
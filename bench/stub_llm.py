@@ -0,0 +1,99 @@
+# bench/stub_llm.py
+"""
+Deterministic OpenAI-compatible stand-in for benchmarks.
+
+Serves /v1/chat/completions and /v1/completions. The answer is always
+`SELECT * FROM <first table in the schema context> LIMIT 10;`, returned
+after a configurable latency, so runs are reproducible and cost nothing.
+
+    python -m bench.stub_llm --port 8765 --latency-ms 300 --jitter-ms 50
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TABLE_RE = re.compile(r"^Table:\s*(\S+)", re.MULTILINE)
+
+
+def answer_for(prompt: str) -> str:
+    context = prompt.split("Schema context:", 1)[-1]
+    m = TABLE_RE.search(context)
+    table = m.group(1) if m else "dual"
+    return f"SELECT * FROM {table} LIMIT 10;"
+
+
+def make_handler(latency_ms: float, jitter_ms: float, seed: int):
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                return self._send(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+            self._send(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            req = json.loads(self.rfile.read(length) or b"{}")
+
+            if self.path.endswith("/chat/completions"):
+                prompt = "\n".join(m.get("content", "") for m in req.get("messages", []))
+            elif self.path.endswith("/completions"):
+                prompt = req.get("prompt", "")
+            else:
+                return self._send(404, {"error": {"message": "not found"}})
+
+            with rng_lock:
+                delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+            time.sleep(delay)
+
+            text = answer_for(prompt)
+            usage = {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(text) // 4,
+                "total_tokens": (len(prompt) + len(text)) // 4,
+            }
+            base = {"id": "stub-1", "created": int(time.time()), "model": req.get("model", "stub"), "usage": usage}
+            if self.path.endswith("/chat/completions"):
+                choice = {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}
+                self._send(200, {**base, "object": "chat.completion", "choices": [choice]})
+            else:
+                choice = {"index": 0, "finish_reason": "stop", "text": text, "logprobs": None}
+                self._send(200, {**base, "object": "text_completion", "choices": [choice]})
+
+    return Handler
+
+
+def start_stub(port: int = 0, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+    """Starts the stub in a daemon thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency_ms, jitter_ms, seed))
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deterministic OpenAI-compatible stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.latency_ms, args.jitter_ms, args.seed))
+    print(f"🤖 Stub LLM on http://127.0.0.1:{args.port}/v1 (latency {args.latency_ms}±{args.jitter_ms} ms)")
+    server.serve_forever()
@@ -0,0 +1,201 @@
+import csv
+import os
+import tempfile
+import time
+import numpy as np
+from faker import Faker
+
+# Default row counts of generate_test_data.py; --scale multiplies them.
+BASE_COUNTS = {
+    "departments": 10,
+    "employees": 200,
+    "customers": 1000,
+    "products": 500,
+    "suppliers": 50,
+    "orders": 2000,
+    "inventory": 500,
+    "order_items": 5000,
+    "payments": 2000,
+    "reviews": 2000,
+}
+
+CATEGORIES = np.array(["Electronics", "Clothing", "Home", "Books", "Sports"], dtype=object)
+ORDER_STATUSES = np.array(["pending", "shipped", "delivered", "cancelled"], dtype=object)
+PAYMENT_METHODS = np.array(["credit_card", "paypal", "cash", "bank_transfer"], dtype=object)
+
+WIDE_TYPES = ["INT", "DECIMAL(12,2)", "VARCHAR(64)", "DATE"]
+
+
+class BulkSeeder:
+    """
+    Generates column batches with NumPy and loads them in large transactions.
+
+    Faker is only called once per pool entry (pool_size values per kind);
+    rows pick from the pools by random index. Loading uses either
+    multi-row INSERTs (cursor.executemany) or LOAD DATA LOCAL INFILE from a
+    CSV written per batch, so memory stays at one batch.
+    """
+
+    def __init__(self, conn, loader="executemany", batch=50000, pool_size=5000, seed=42):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.loader = loader
+        self.batch = batch
+        self.rng = np.random.default_rng(seed)
+        self.today = np.datetime64("today", "D")
+
+        fake = Faker()
+        Faker.seed(seed)
+        print(f"🎲 Building Faker pools ({pool_size} values each)...")
+        self.pools = {
+            "name": np.array([fake.name() for _ in range(pool_size)], dtype=object),
+            "email": np.array([fake.email() for _ in range(pool_size)], dtype=object),
+            "company": np.array([fake.company() for _ in range(pool_size)], dtype=object),
+            "city": np.array([fake.city() for _ in range(pool_size)], dtype=object),
+            "word": np.array([fake.word().capitalize() for _ in range(pool_size)], dtype=object),
+            "phone": np.array([fake.phone_number() for _ in range(pool_size)], dtype=object),
+            "sentence": np.array([fake.sentence() for _ in range(pool_size)], dtype=object),
+        }
+
+    # -----------------------------------------------------------------
+    # Column generators (one NumPy array per column)
+    # -----------------------------------------------------------------
+    def pick(self, kind, n):
+        pool = self.pools[kind]
+        return pool[self.rng.integers(0, len(pool), n)]
+
+    def choice(self, values, n):
+        return values[self.rng.integers(0, len(values), n)]
+
+    def ints(self, low, high, n):
+        return self.rng.integers(low, high + 1, n)
+
+    def money(self, low, high, n):
+        return np.round(self.rng.uniform(low, high, n), 2)
+
+    def dates(self, days_back, n):
+        return (self.today - self.rng.integers(0, days_back + 1, n).astype("timedelta64[D]")).astype(str)
+
+    # -----------------------------------------------------------------
+    # Loading
+    # -----------------------------------------------------------------
+    def max_id(self, table):
+        self.cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM `{table}`")
+        return int(self.cursor.fetchone()[0])
+
+    def load(self, table, columns, total, make_batch):
+        """Calls make_batch(n) -> list of column arrays until `total` rows are loaded."""
+        t0 = time.perf_counter()
+        self.cursor.execute("SET unique_checks = 0, foreign_key_checks = 0")
+        try:
+            done = 0
+            while done < total:
+                n = min(self.batch, total - done)
+                cols = [np.asarray(c).tolist() for c in make_batch(n)]
+                rows = list(zip(*cols))
+                if self.loader == "infile":
+                    self._load_infile(table, columns, rows)
+                else:
+                    placeholders = ", ".join(["%s"] * len(columns))
+                    self.cursor.executemany(
+                        f"INSERT INTO `{table}` ({', '.join(columns)}) VALUES ({placeholders})", rows
+                    )
+                self.conn.commit()
+                done += n
+        finally:
+            self.cursor.execute("SET unique_checks = 1, foreign_key_checks = 1")
+        elapsed = time.perf_counter() - t0
+        print(f"Inserted {total} {table} in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+
+    def _load_infile(self, table, columns, rows):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        try:
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f, lineterminator="\n").writerows(rows)
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table}` "
+                f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                (path,)
+            )
+        finally:
+            os.remove(path)
+
+    # -----------------------------------------------------------------
+    # Core demo schema
+    # -----------------------------------------------------------------
+    def seed_core(self, scale=1.0):
+        counts = {t: max(1, int(n * scale)) for t, n in BASE_COUNTS.items()}
+
+        self.load("departments", ["name", "location"], counts["departments"],
+                  lambda n: [self.pick("company", n), self.pick("city", n)])
+        dept_max = self.max_id("departments")
+
+        self.load("employees", ["name", "email", "hire_date", "department_id", "salary"], counts["employees"],
+                  lambda n: [self.pick("name", n), self.pick("email", n), self.dates(3650, n),
+                             self.ints(1, dept_max, n), self.money(40000, 120000, n)])
+        emp_max = self.max_id("employees")
+
+        self.load("customers", ["name", "email", "join_date"], counts["customers"],
+                  lambda n: [self.pick("name", n), self.pick("email", n), self.dates(1095, n)])
+        cust_max = self.max_id("customers")
+
+        self.load("products", ["name", "category", "price", "stock"], counts["products"],
+                  lambda n: [self.pick("word", n), self.choice(CATEGORIES, n),
+                             self.money(10, 5000, n), self.ints(1, 500, n)])
+        prod_max = self.max_id("products")
+
+        self.load("suppliers", ["name", "contact_email", "phone"], counts["suppliers"],
+                  lambda n: [self.pick("company", n), self.pick("email", n), self.pick("phone", n)])
+        supp_max = self.max_id("suppliers")
+
+        self.load("orders", ["customer_id", "employee_id", "order_date", "total_amount", "status"], counts["orders"],
+                  lambda n: [self.ints(1, cust_max, n), self.ints(1, emp_max, n), self.dates(1095, n),
+                             self.money(50, 5000, n), self.choice(ORDER_STATUSES, n)])
+        order_max = self.max_id("orders")
+
+        self.load("inventory", ["product_id", "supplier_id", "received_date", "quantity"], counts["inventory"],
+                  lambda n: [self.ints(1, prod_max, n), self.ints(1, supp_max, n), self.dates(365, n),
+                             self.ints(1, 100, n)])
+
+        self.load("order_items", ["order_id", "product_id", "quantity", "price"], counts["order_items"],
+                  lambda n: [self.ints(1, order_max, n), self.ints(1, prod_max, n), self.ints(1, 10, n),
+                             self.money(10, 5000, n)])
+
+        self.load("payments", ["order_id", "payment_date", "amount", "method"], counts["payments"],
+                  lambda n: [self.ints(1, order_max, n), self.dates(730, n), self.money(50, 5000, n),
+                             self.choice(PAYMENT_METHODS, n)])
+
+        self.load("reviews", ["customer_id", "product_id", "rating", "comment", "review_date"], counts["reviews"],
+                  lambda n: [self.ints(1, cust_max, n), self.ints(1, prod_max, n), self.ints(1, 5, n),
+                             self.pick("sentence", n), self.dates(730, n)])
+
+    # -----------------------------------------------------------------
+    # Wide synthetic schemas (thousands of tables)
+    # -----------------------------------------------------------------
+    def seed_wide(self, n_tables, n_cols, rows):
+        print(f"🧱 Creating {n_tables} synthetic tables x {n_cols} columns, {rows} rows each")
+        col_names = [f"c{j:03d}" for j in range(n_cols)]
+        col_types = [WIDE_TYPES[j % len(WIDE_TYPES)] for j in range(n_cols)]
+
+        def make_batch(n):
+            out = []
+            for typ in col_types:
+                if typ == "INT":
+                    out.append(self.ints(0, 100000, n))
+                elif typ.startswith("DECIMAL"):
+                    out.append(self.money(0, 100000, n))
+                elif typ.startswith("VARCHAR"):
+                    out.append(self.pick("word", n))
+                else:
+                    out.append(self.dates(3650, n))
+            return out
+
+        for i in range(n_tables):
+            table = f"synthetic_{i:05d}"
+            cols_sql = ", ".join(f"{c} {t}" for c, t in zip(col_names, col_types))
+            self.cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS `{table}` (id INT AUTO_INCREMENT PRIMARY KEY, {cols_sql})"
+            )
+            if rows:
+                self.load(table, col_names, rows, make_batch)
@@ -1,3 +1,4 @@
+import argparse
 import os
 import random
 from datetime import datetime, timedelta
@@ -14,27 +15,26 @@ PASSWORD = os.getenv("DB_PASS", "demo_pass")
 DB_NAME = os.getenv("DB_NAME", "demo_db")
 
 # Try connecting multiple times if MySQL is still starting up
-for i in range(10):
-    try:
-        conn = pymysql.connect(
-            host=HOST,
-            port=PORT,
-            user=USER,
-            password=PASSWORD,
-            autocommit=True
-        )
-        print("✅ Connected to MySQL!")
-        break
-    except Exception as e:
-        print(f"⏳ Attempt {i+1}/10: MySQL not ready yet -> {e}")
-        time.sleep(5)
-else:
+def connect(autocommit=True, local_infile=False):
+    for i in range(10):
+        try:
+            conn = pymysql.connect(
+                host=HOST,
+                port=PORT,
+                user=USER,
+                password=PASSWORD,
+                autocommit=autocommit,
+                local_infile=local_infile
+            )
+            print("✅ Connected to MySQL!")
+            return conn
+        except Exception as e:
+            print(f"⏳ Attempt {i+1}/10: MySQL not ready yet -> {e}")
+            time.sleep(5)
     raise RuntimeError("❌ Could not connect to MySQL after several retries.")
 
-cursor = conn.cursor()
-cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME}")
-cursor.execute(f"USE {DB_NAME}")
-print(f"📦 Using database: {DB_NAME}")
+conn = None
+cursor = None
 # # Step 1: Create database
 # cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME}")
 # cursor.execute(f"USE {DB_NAME}")
@@ -142,9 +142,13 @@ tables_sql = [
     """
 ]
 
-for sql in tables_sql:
-    cursor.execute(sql)
-print("✅ Tables created successfully!")
+def create_tables():
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_NAME}")
+    cursor.execute(f"USE {DB_NAME}")
+    print(f"📦 Using database: {DB_NAME}")
+    for sql in tables_sql:
+        cursor.execute(sql)
+    print("✅ Tables created successfully!")
 
 # Step 3: Populate data
 def seed_departments(n=10):
@@ -252,16 +256,74 @@ def seed_payments(n=2000):
         ))
     print(f"Inserted {n} payments")
 
-# Run seeding in order
-seed_departments()
-seed_employees()
-seed_customers()
-seed_products()
-seed_suppliers()
-seed_orders()
-seed_inventory()
-seed_order_items()
-seed_payments()
-print("🎉 Complex fake enterprise DB generated successfully!")
-cursor.close()
-conn.close()
+def seed_reviews(n=2000):
+    customer_ids = [i + 1 for i in range(1000)]
+    product_ids = [i + 1 for i in range(500)]
+    for _ in range(n):
+        cursor.execute("""
+            INSERT INTO reviews (customer_id, product_id, rating, comment, review_date)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (
+            random.choice(customer_ids),
+            random.choice(product_ids),
+            random.randint(1, 5),
+            fake.sentence(),
+            fake.date_between(start_date="-2y", end_date="today")
+        ))
+    print(f"Inserted {n} reviews")
+
+def seed_row_by_row():
+    # Run seeding in order
+    seed_departments()
+    seed_employees()
+    seed_customers()
+    seed_products()
+    seed_suppliers()
+    seed_orders()
+    seed_inventory()
+    seed_order_items()
+    seed_payments()
+    seed_reviews()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the demo MySQL database with fake data")
+    parser.add_argument("--bulk", action="store_true", help="Vectorized bulk generation (NumPy + batched loads)")
+    # Bulk-only options default to None so they can be rejected without --bulk
+    parser.add_argument("--scale", type=float, help="Multiply default row counts (bulk mode, default 1)")
+    parser.add_argument("--loader", choices=["executemany", "infile"],
+                        help="Bulk loader: multi-row INSERTs (default) or LOAD DATA LOCAL INFILE from CSV")
+    parser.add_argument("--batch", type=int, help="Rows per batch/transaction (bulk mode, default 50000)")
+    parser.add_argument("--faker-pool", type=int, help="Pre-generated Faker values per kind (default 5000)")
+    parser.add_argument("--extra-tables", type=int, help="Extra synthetic tables for wide schemas (default 0)")
+    parser.add_argument("--extra-cols", type=int, help="Columns per extra table (default 20)")
+    parser.add_argument("--extra-rows", type=int, help="Rows per extra table before --scale (default 1000)")
+    parser.add_argument("--seed", type=int, help="Random seed (bulk mode, default 42)")
+    args = parser.parse_args()
+
+    bulk_defaults = {"scale": 1.0, "loader": "executemany", "batch": 50000, "faker_pool": 5000,
+                     "extra_tables": 0, "extra_cols": 20, "extra_rows": 1000, "seed": 42}
+    given = ["--" + k.replace("_", "-") for k in bulk_defaults if getattr(args, k) is not None]
+    if given and not args.bulk:
+        parser.error(f"{', '.join(given)} only apply with --bulk")
+    for k, v in bulk_defaults.items():
+        if getattr(args, k) is None:
+            setattr(args, k, v)
+
+    conn = connect(autocommit=not args.bulk, local_infile=args.loader == "infile")
+    cursor = conn.cursor()
+    create_tables()
+
+    if args.bulk:
+        from bulk_seed import BulkSeeder
+
+        seeder = BulkSeeder(conn, loader=args.loader, batch=args.batch, pool_size=args.faker_pool, seed=args.seed)
+        seeder.seed_core(scale=args.scale)
+        if args.extra_tables:
+            seeder.seed_wide(args.extra_tables, args.extra_cols, int(args.extra_rows * args.scale))
+    else:
+        seed_row_by_row()
+
+    print("🎉 Complex fake enterprise DB generated successfully!")
+    cursor.close()
+    conn.close()
@@ -0,0 +1,201 @@
+# src/column_stats.py
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import text
+from src.config import STATS_PATH, STATS_SCAN_ROWS, STATS_MAX_DISTINCT, STATS_MAX_VALUE_LEN
+
+# ---------------------------------------------------------------------
+# Value dictionaries for low-cardinality string columns.
+#
+# For every short string column we look at the first STATS_SCAN_ROWS rows
+# (bounded, never a full scan) and keep the distinct values with counts
+# when there are at most STATS_MAX_DISTINCT of them. Stored as compact
+# JSON keyed by table, with a signature so unchanged tables are skipped
+# on the next build.
+# ---------------------------------------------------------------------
+STRING_TYPE_RE = re.compile(r"char|enum|set\(|string", re.IGNORECASE)
+WORD_RE = re.compile(r"[a-z0-9_]+")
+STATS_FORMAT = 2  # 2: over-long values are dropped instead of truncated
+
+
+def candidate_columns(cols: List[dict]) -> List[dict]:
+    return [
+        c for c in cols
+        if STRING_TYPE_RE.search(str(c.get("COLUMN_TYPE") or "")) and c.get("COLUMN_KEY") != "PRI"
+    ]
+
+
+def table_signature(table_meta: dict, cols: List[dict], data_marker: str = None) -> str:
+    sig = [table_meta.get("TABLE_ROWS"), str(table_meta.get("UPDATE_TIME")), data_marker]
+    sig += [(c["COLUMN_NAME"], str(c.get("COLUMN_TYPE"))) for c in cols]
+    return hashlib.sha256(json.dumps(sig, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def load_stats(path: str = STATS_PATH) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": STATS_FORMAT, "tables": {}}
+
+
+def save_stats(stats: Dict, path: str = STATS_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(stats, f, separators=(",", ":"), default=str)
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------
+# Collection
+# ---------------------------------------------------------------------
+def table_value_stats(conn, dialect, table: str, cols: List[dict], schema: str = None) -> Dict:
+    """One bounded UNION ALL query per table: value counts for each candidate column."""
+    cols = candidate_columns(cols)
+    if not cols:
+        return {}
+
+    source = dialect.qualified(table, schema)
+    parts = []
+    for i, c in enumerate(cols):
+        col = dialect.quote(c["COLUMN_NAME"])
+        parts.append(
+            f"SELECT * FROM (SELECT {i} AS c, v, COUNT(*) AS n "
+            f"FROM (SELECT {col} AS v FROM {source} LIMIT :scan) s{i} "
+            f"WHERE v IS NOT NULL GROUP BY v ORDER BY n DESC LIMIT :lim) g{i}"
+        )
+    q = text(" UNION ALL ".join(parts))
+    rows = conn.execute(q, {"scan": STATS_SCAN_ROWS, "lim": STATS_MAX_DISTINCT + 1}).all()
+
+    grouped = {}
+    for c_idx, v, n in rows:
+        grouped.setdefault(c_idx, []).append((v, n))
+
+    out = {}
+    for i, c in enumerate(cols):
+        values = grouped.get(i, [])
+        low_card = len(values) <= STATS_MAX_DISTINCT
+        # values longer than STATS_MAX_VALUE_LEN are dropped, not cut: hints must be exact literals
+        kept = [[str(v), int(n)] for v, n in values if len(str(v)) <= STATS_MAX_VALUE_LEN] if low_card else []
+        out[c["COLUMN_NAME"]] = {
+            # distinct values among the scanned rows, capped at STATS_MAX_DISTINCT + 1;
+            # not a cardinality estimate for the whole table
+            "ndv": len(values),
+            "low_card": low_card,
+            "values": kept,
+        }
+    return out
+
+
+def update_stats(engine, dialect, tables: List[dict], all_cols: Dict[str, List[dict]],
+                 schema: str = None, path: str = STATS_PATH, prune: bool = True) -> Dict:
+    """
+    Refreshes stats for tables whose signature changed. With prune=True,
+    `tables` is the full table list and anything not in it is dropped.
+    """
+    stats = load_stats(path)
+    if prune and stats.get("version") != STATS_FORMAT:
+        # full build: re-profile everything once (partial refreshes keep the old entries until then)
+        stats = {"version": STATS_FORMAT, "tables": {}}
+    known = stats["tables"]
+    if prune:
+        live = {t["TABLE_NAME"] for t in tables}
+        for name in list(known):
+            if name not in live:
+                del known[name]
+
+    refreshed = 0
+    with engine.connect() as conn:
+        for t in tables:
+            name = t["TABLE_NAME"]
+            cols = all_cols.get(name, [])
+            try:
+                marker = None
+                if t.get("TABLE_ROWS") is None and t.get("UPDATE_TIME") is None:
+                    # e.g. SQLite: no metadata moves when data changes, so ask the table
+                    marker = dialect.data_marker(conn, name, schema, STATS_SCAN_ROWS)
+                sig = table_signature(t, cols, marker)
+                if known.get(name, {}).get("signature") == sig:
+                    continue
+                columns = table_value_stats(conn, dialect, name, cols, schema)
+            except Exception as e:
+                print(f"⚠️ Column stats failed for {name}: {e}")
+                # PostgreSQL aborts the transaction on any error; keep the next tables working
+                conn.rollback()
+                continue
+            known[name] = {"signature": sig, "collected_at": datetime.utcnow().isoformat(), "columns": columns}
+            refreshed += 1
+
+    save_stats(stats, path)
+    print(f"📇 Column stats: refreshed {refreshed}, unchanged {len(tables) - refreshed}.")
+    return stats
+
+
+def forget_tables(names: List[str], path: str = STATS_PATH):
+    stats = load_stats(path)
+    for name in names:
+        stats.get("tables", {}).pop(name, None)
+    save_stats(stats, path)
+
+
+# ---------------------------------------------------------------------
+# Lookup (prompt time)
+# ---------------------------------------------------------------------
+_cache = {"mtime": None, "stats": None}
+
+
+def _cached_stats(path: str = STATS_PATH) -> Dict:
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {"tables": {}}
+    if _cache["mtime"] != mtime:
+        _cache["stats"] = load_stats(path)
+        _cache["mtime"] = mtime
+    return _cache["stats"]
+
+
+def _value_matches(value: str, question_lower: str, words: set) -> bool:
+    v = value.lower()
+    if len(v) >= 3 and v in question_lower:
+        return True
+    # token/prefix match, so "ship" style stems and multi-word values still hit
+    for tok in WORD_RE.findall(v):
+        if len(tok) < 3:
+            continue
+        if tok in words or any(len(w) >= 4 and (tok.startswith(w) or w.startswith(tok)) for w in words):
+            return True
+    return False
+
+
+def match_values(question: str, tables: List[str], max_per_column: int = 10) -> Dict[str, List[str]]:
+    """Returns {"table.column": [values...]} for stored values that match terms in the question."""
+    stats = _cached_stats()["tables"]
+    q = question.lower()
+    words = set(WORD_RE.findall(q))
+
+    out = {}
+    for table in dict.fromkeys(tables):
+        for column, st in (stats.get(table, {}).get("columns") or {}).items():
+            hits = [v for v, _ in st.get("values", []) if _value_matches(v, q, words)]
+            if hits:
+                out[f"{table}.{column}"] = hits[:max_per_column]
+    return out
+
+
+def sql_literal(value: str) -> str:
+    """ANSI SQL string literal: single quotes, embedded quotes doubled."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def format_value_hints(matches: Dict[str, List[str]]) -> str:
+    if not matches:
+        return ""
+    lines = ["Known column values matching the question (use these exact literals):"]
+    for col, values in matches.items():
+        lines.append(f"- {col}: " + ", ".join(sql_literal(v) for v in values))
+    return "\n".join(lines) + "\n"
@@ -2,6 +2,7 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
 
 load_dotenv()  # read .env if present
 
@@ -13,12 +14,58 @@ DB_NAME = os.getenv("DB_NAME", "demo_db")
 DB_USER = os.getenv("DB_USER", "demo_user")
 DB_PASS = os.getenv("DB_PASS", "demo_pass")
 DB_URI = os.getenv("DB_URI") or f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Names the collection and per-database state files; SQLite URLs carry a file path instead of a database name
+DB_LABEL = DB_NAME if DB_URI.startswith("sqlite") else (make_url(DB_URI).database or DB_NAME)
 
 CHROMA_DIR = os.getenv("CHROMA_DIR", str(BASE_DIR / "chroma_store"))
 EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-small")
+LOCAL_EMBED_MODEL = os.getenv("LOCAL_EMBED_MODEL", "all-MiniLM-L6-v2")  # sentence-transformers model used for all embeddings
 EMBED_BATCH = int(os.getenv("EMBED_BATCH", "32"))
+EMBED_PROCESSES = int(os.getenv("EMBED_PROCESSES", "1"))  # encoder processes for large index builds; each holds a model copy
+UPSERT_CHUNK = int(os.getenv("UPSERT_CHUNK", "2048"))  # chunks embedded + written per window
 
 # OpenAI-like client config (we'll import LLM_API_1 if the user provided it)
 # You may alternatively set OPENAI_API_KEY and OPENAI_BASE_URL
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+
+# Few-shot example store (dynamic example selection)
+FEW_SHOT_K = int(os.getenv("FEW_SHOT_K", "3"))
+FEW_SHOT_TOKEN_BUDGET = int(os.getenv("FEW_SHOT_TOKEN_BUDGET", "400"))
+FEW_SHOT_MAX_DISTANCE = float(os.getenv("FEW_SHOT_MAX_DISTANCE", "1.2"))
+EXAMPLES_AUTO_ADD = os.getenv("EXAMPLES_AUTO_ADD", "0") == "1"  # "ran without error" is not "correct"
+
+# Structured query log (JSON lines, written off the request path)
+QUERY_LOG_PATH = os.getenv("QUERY_LOG_PATH", str(BASE_DIR / "query_log.jsonl"))
+QUERY_LOG_MAX_BYTES = int(os.getenv("QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+QUERY_LOG_BACKUPS = int(os.getenv("QUERY_LOG_BACKUPS", "5"))
+QUERY_LOG_BATCH = int(os.getenv("QUERY_LOG_BATCH", "64"))
+
+# Tracing / metrics: comma-separated list of none | local | prometheus | otel
+TRACING_BACKEND = os.getenv("TRACING_BACKEND", "none")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+
+# Sample rows in schema docs: first | distinct | tablesample (PostgreSQL; others fall back to first)
+SAMPLE_MODE = os.getenv("SAMPLE_MODE", "first")
+SAMPLE_MAX_CHARS = int(os.getenv("SAMPLE_MAX_CHARS", "64"))
+SAMPLE_MAX_COLS = int(os.getenv("SAMPLE_MAX_COLS", "24"))
+
+# Column value dictionaries (low-cardinality string columns) for prompt grounding
+STATS_ENABLED = os.getenv("STATS_ENABLED", "1") == "1"
+STATS_PATH = os.getenv("STATS_PATH", str(BASE_DIR / f"column_stats_{DB_LABEL}.json"))
+STATS_SCAN_ROWS = int(os.getenv("STATS_SCAN_ROWS", "10000"))
+STATS_MAX_DISTINCT = int(os.getenv("STATS_MAX_DISTINCT", "50"))
+STATS_MAX_VALUE_LEN = int(os.getenv("STATS_MAX_VALUE_LEN", "64"))
+
+# HTTP server (src/server.py)
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "4"))
+SERVER_MAX_QUEUE = int(os.getenv("SERVER_MAX_QUEUE", "32"))
+SERVER_QUEUE_TIMEOUT = float(os.getenv("SERVER_QUEUE_TIMEOUT", "30"))
+
+# Schema watcher: poll table fingerprints and re-index only changed tables
+WATCH_INTERVAL = float(os.getenv("WATCH_INTERVAL", "0"))  # seconds; 0 = off (server)
+WATCH_SNAPSHOT_PATH = os.getenv("WATCH_SNAPSHOT_PATH", str(BASE_DIR / f"schema_snapshot_{DB_LABEL}.json"))
+WATCH_DATA_CHANGES = os.getenv("WATCH_DATA_CHANGES", "0") == "1"
+
+# Binary index snapshots (src/index_snapshot.py): rows per Chroma get/upsert page
+SNAPSHOT_CHUNK = int(os.getenv("SNAPSHOT_CHUNK", "2000"))
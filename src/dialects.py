@@ -0,0 +1,505 @@
+# src/dialects.py
+import hashlib
+import json
+import re
+from typing import Dict, List
+from sqlalchemy import inspect, text
+
+# ---------------------------------------------------------------------
+# Dialect layer: bulk metadata queries + dialect-specific SQL snippets.
+#
+# Every dialect returns the same MySQL-shaped dicts the rest of the code
+# already uses (TABLE_NAME/COLUMN_NAME/COLUMN_TYPE/..., and SHOW INDEX
+# style Key_name/Non_unique/Column_name for indexes), grouped by table,
+# so one query covers the whole schema instead of three per table.
+# ---------------------------------------------------------------------
+LIMIT_RE = re.compile(r"\bLIMIT\s+\d+|\bFETCH\s+(?:FIRST|NEXT)\s+\d+", re.IGNORECASE)
+
+# Column types that are useless in a prompt (skipped) / worth truncating
+BINARY_TYPE_RE = re.compile(r"blob|binary|bytea|geometry|point|polygon|linestring|image|\braw\b", re.IGNORECASE)
+TEXT_TYPE_RE = re.compile(r"char|text|clob|json|enum|set\(|xml|string", re.IGNORECASE)
+
+
+def sample_columns(cols: List[dict], max_cols: int) -> List[dict]:
+    """Columns worth sampling: non-binary, keys first, capped at max_cols."""
+    usable = [c for c in cols if not BINARY_TYPE_RE.search(str(c.get("COLUMN_TYPE") or ""))]
+    usable.sort(key=lambda c: (c.get("COLUMN_KEY") not in ("PRI", "MUL", "UNI"), c.get("ORDINAL_POSITION") or 0))
+    keep = {c["COLUMN_NAME"] for c in usable[:max_cols]}
+    return [c for c in cols if c["COLUMN_NAME"] in keep]
+
+
+def _group(rows, key: str = "TABLE_NAME") -> Dict[str, List[dict]]:
+    out = {}
+    for r in rows:
+        r = dict(r)
+        out.setdefault(r.pop(key), []).append(r)
+    return out
+
+
+class Dialect:
+    name = "generic"
+    sql_name = "SQL"
+    supports_tablesample = False  # sample_source() honours mode="tablesample"
+
+    def default_schema(self, engine):
+        return engine.url.database
+
+    def quote(self, ident: str) -> str:
+        return '"' + ident.replace('"', '""') + '"'
+
+    def qualified(self, table: str, schema: str = None) -> str:
+        return f"{self.quote(schema)}.{self.quote(table)}" if schema else self.quote(table)
+
+    # -- row limiting ----------------------------------------------------
+    def has_limit(self, sql: str) -> bool:
+        return bool(LIMIT_RE.search(sql))
+
+    def apply_limit(self, sql: str, limit: int) -> str:
+        """Appends a row limit unless the query already has one."""
+        if self.has_limit(sql):
+            return sql
+        return sql.strip().rstrip(";") + f" LIMIT {int(limit)};"
+
+    # -- sampling --------------------------------------------------------
+    def truncate(self, expr: str, max_chars: int) -> str:
+        return f"CAST({expr} AS VARCHAR({int(max_chars)}))"
+
+    def sample_source(self, table: str, schema: str = None, mode: str = "first") -> str:
+        """FROM target for sampling; dialects with TABLESAMPLE override this."""
+        return self.qualified(table, schema)
+
+    def sample_query(self, table: str, n: int, schema: str = None, mode: str = "first",
+                     cols: List[dict] = None, max_chars: int = 64, scan_rows: int = 1000):
+        """
+        Returns (sql, params) selecting up to n rows from `table`.
+
+        With `cols`, only those columns are projected and text-like values are
+        truncated server-side to `max_chars`. Modes:
+          first       -> first n rows
+          distinct    -> n distinct rows among the first `scan_rows` (bounded)
+          tablesample -> block-level random sample where supported, else first
+        """
+        if not cols:
+            return f"SELECT * FROM {self.sample_source(table, schema, mode)} LIMIT :n", {"n": n}
+        if mode == "distinct":
+            # primary keys would make every row distinct
+            cols = [c for c in cols if c.get("COLUMN_KEY") != "PRI"] or cols
+
+        raw = ", ".join(self.quote(c["COLUMN_NAME"]) for c in cols)
+        proj = []
+        for c in cols:
+            name = self.quote(c["COLUMN_NAME"])
+            if TEXT_TYPE_RE.search(str(c.get("COLUMN_TYPE") or "")):
+                proj.append(f"{self.truncate(name, max_chars)} AS {name}")
+            else:
+                proj.append(name)
+        proj = ", ".join(proj)
+
+        source = self.sample_source(table, schema, mode)
+        if mode == "distinct":
+            return (
+                f"SELECT DISTINCT {proj} FROM (SELECT {raw} FROM {source} LIMIT :scan) s LIMIT :n",
+                {"n": n, "scan": max(n, scan_rows)},
+            )
+        return f"SELECT {proj} FROM {source} LIMIT :n", {"n": n}
+
+    # -- change detection ------------------------------------------------
+    def table_fingerprints(self, conn, schema: str = None, include_data: bool = False) -> Dict[str, str]:
+        """
+        Cheap per-table fingerprint used by the schema watcher: changes when the
+        table's columns change (and, with include_data, when its data changes
+        where the backend exposes that). Generic fallback hashes columns().
+        """
+        return {
+            t: hashlib.sha256(json.dumps(cols, default=str, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+            for t, cols in self.columns(conn, schema).items()
+        }
+
+    def data_marker(self, conn, table: str, schema: str = None, scan_rows: int = 10000) -> str:
+        """
+        Cheap data-change marker for backends whose table metadata has no
+        row estimate or update time: row count, capped at scan_rows.
+        """
+        q = text(f"SELECT COUNT(*) FROM (SELECT 1 FROM {self.qualified(table, schema)} LIMIT :scan) s")
+        return str(conn.execute(q, {"scan": scan_rows}).scalar())
+
+    # -- metadata --------------------------------------------------------
+    # Generic fallback: SQLAlchemy inspect(), one round trip per table.
+    def list_tables(self, conn, schema: str = None) -> List[dict]:
+        insp = inspect(conn)
+        tables = [{"TABLE_NAME": t, "TABLE_TYPE": "BASE TABLE"} for t in insp.get_table_names(schema=schema)]
+        tables += [{"TABLE_NAME": v, "TABLE_TYPE": "VIEW"} for v in insp.get_view_names(schema=schema)]
+        for t in tables:
+            t.update({"ENGINE": conn.dialect.name, "TABLE_ROWS": None, "CREATE_TIME": None, "UPDATE_TIME": None})
+        return tables
+
+    def _tables(self, conn, schema, table):
+        return [table] if table else [t["TABLE_NAME"] for t in self.list_tables(conn, schema)]
+
+    def columns(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        insp = inspect(conn)
+        out = {}
+        for t in self._tables(conn, schema, table):
+            pk = set(insp.get_pk_constraint(t, schema=schema).get("constrained_columns") or [])
+            out[t] = [
+                {
+                    "COLUMN_NAME": c["name"],
+                    "ORDINAL_POSITION": i,
+                    "COLUMN_TYPE": str(c["type"]),
+                    "IS_NULLABLE": "YES" if c.get("nullable", True) else "NO",
+                    "COLUMN_KEY": "PRI" if c["name"] in pk else "",
+                    "COLUMN_DEFAULT": c.get("default"),
+                    "EXTRA": "auto_increment" if c.get("autoincrement") is True else "",
+                }
+                for i, c in enumerate(insp.get_columns(t, schema=schema), start=1)
+            ]
+        return out
+
+    def foreign_keys(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        insp = inspect(conn)
+        out = {}
+        for t in self._tables(conn, schema, table):
+            out[t] = [
+                {
+                    "CONSTRAINT_NAME": fk.get("name"),
+                    "COLUMN_NAME": col,
+                    "REFERENCED_TABLE_NAME": fk["referred_table"],
+                    "REFERENCED_COLUMN_NAME": ref,
+                }
+                for fk in insp.get_foreign_keys(t, schema=schema)
+                for col, ref in zip(fk["constrained_columns"], fk["referred_columns"])
+            ]
+        return out
+
+    def indexes(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        insp = inspect(conn)
+        out = {}
+        for t in self._tables(conn, schema, table):
+            out[t] = [
+                {"Key_name": idx["name"], "Non_unique": 0 if idx.get("unique") else 1, "Column_name": col}
+                for idx in insp.get_indexes(t, schema=schema)
+                for col in idx["column_names"]
+            ]
+        return out
+
+
+# ---------------------------------------------------------------------
+# MySQL / MariaDB: information_schema
+# ---------------------------------------------------------------------
+class MySQLDialect(Dialect):
+    name = "mysql"
+    sql_name = "MySQL"
+
+    def quote(self, ident: str) -> str:
+        return "`" + ident.replace("`", "``") + "`"
+
+    def truncate(self, expr: str, max_chars: int) -> str:
+        return f"LEFT({expr}, {int(max_chars)})"
+
+    def table_fingerprints(self, conn, schema: str = None, include_data: bool = False) -> Dict[str, str]:
+        # Order-independent checksum over column definitions (no GROUP_CONCAT length limit),
+        # plus CREATE_TIME (changes on ALTER/recreate) and optionally UPDATE_TIME.
+        q = text("""
+          SELECT t.TABLE_NAME, t.CREATE_TIME, t.UPDATE_TIME, c.N_COLS, c.COLS_CRC
+          FROM information_schema.tables t
+          LEFT JOIN (
+            SELECT TABLE_NAME, COUNT(*) AS N_COLS,
+                   SUM(CRC32(CONCAT_WS(':', ORDINAL_POSITION, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE,
+                                       COLUMN_KEY, IFNULL(COLUMN_DEFAULT, ''), EXTRA))) AS COLS_CRC
+            FROM information_schema.columns
+            WHERE TABLE_SCHEMA = :db
+            GROUP BY TABLE_NAME
+          ) c ON c.TABLE_NAME = t.TABLE_NAME
+          WHERE t.TABLE_SCHEMA = :db
+        """)
+        out = {}
+        for r in conn.execute(q, {"db": schema}).mappings().all():
+            fp = f"{r['CREATE_TIME']}|{r['N_COLS']}|{r['COLS_CRC']}"
+            if include_data:
+                fp += f"|{r['UPDATE_TIME']}"
+            out[r["TABLE_NAME"]] = fp
+        return out
+
+    def list_tables(self, conn, schema: str = None) -> List[dict]:
+        q = text("""
+          SELECT TABLE_NAME, TABLE_TYPE, ENGINE, TABLE_ROWS, CREATE_TIME, UPDATE_TIME
+          FROM information_schema.tables
+          WHERE TABLE_SCHEMA = :db
+        """)
+        return [dict(r) for r in conn.execute(q, {"db": schema}).mappings().all()]
+
+    def columns(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        q = """
+          SELECT TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA
+          FROM information_schema.columns
+          WHERE TABLE_SCHEMA = :db {table_filter}
+          ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """
+        return self._run(conn, q, schema, table)
+
+    def foreign_keys(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        q = """
+          SELECT TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+          FROM information_schema.key_column_usage
+          WHERE TABLE_SCHEMA = :db AND REFERENCED_TABLE_NAME IS NOT NULL {table_filter}
+        """
+        return self._run(conn, q, schema, table)
+
+    def indexes(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        q = """
+          SELECT TABLE_NAME, INDEX_NAME AS Key_name, NON_UNIQUE AS Non_unique, COLUMN_NAME AS Column_name
+          FROM information_schema.statistics
+          WHERE TABLE_SCHEMA = :db {table_filter}
+          ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+        """
+        return self._run(conn, q, schema, table)
+
+    def _run(self, conn, q: str, schema: str, table: str):
+        params = {"db": schema}
+        if table:
+            params["table"] = table
+        q = q.format(table_filter="AND TABLE_NAME = :table" if table else "")
+        return _group(conn.execute(text(q), params).mappings().all())
+
+
+# ---------------------------------------------------------------------
+# PostgreSQL: pg_catalog (much cheaper than information_schema views)
+# ---------------------------------------------------------------------
+class PostgresDialect(Dialect):
+    name = "postgresql"
+    sql_name = "PostgreSQL"
+    supports_tablesample = True
+
+    def default_schema(self, engine):
+        return "public"
+
+    def truncate(self, expr: str, max_chars: int) -> str:
+        return f"LEFT(CAST({expr} AS TEXT), {int(max_chars)})"
+
+    def sample_source(self, table: str, schema: str = None, mode: str = "first") -> str:
+        if mode == "tablesample":
+            # SYSTEM samples whole pages: cheap, approximate, never a full scan
+            return f"{self.qualified(table, schema)} TABLESAMPLE SYSTEM (1)"
+        return self.qualified(table, schema)
+
+    def table_fingerprints(self, conn, schema: str = None, include_data: bool = False) -> Dict[str, str]:
+        data = "COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)" if include_data else "0"
+        # columns, plus constraint (PK/FK/unique/check) and index definitions: the docs render all of them
+        q = text(f"""
+          SELECT c.relname AS table_name,
+                 md5(string_agg(a.attnum || ':' || a.attname || ':' || format_type(a.atttypid, a.atttypmod)
+                                || ':' || a.attnotnull, ',' ORDER BY a.attnum)) AS cols_md5,
+                 (SELECT md5(string_agg(con.conname || ':' || pg_get_constraintdef(con.oid), ','
+                                        ORDER BY con.conname))
+                    FROM pg_constraint con WHERE con.conrelid = c.oid) AS cons_md5,
+                 (SELECT md5(string_agg(pg_get_indexdef(ix.indexrelid), ','
+                                        ORDER BY pg_get_indexdef(ix.indexrelid)))
+                    FROM pg_index ix WHERE ix.indrelid = c.oid) AS idx_md5,
+                 MAX({data}) AS data_version
+          FROM pg_class c
+          JOIN pg_namespace n ON n.oid = c.relnamespace
+          JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+          LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+          WHERE n.nspname = :db AND c.relkind IN ('r', 'p', 'v', 'm')
+          GROUP BY c.oid, c.relname
+        """)
+        return {
+            r["table_name"]: f"{r['cols_md5']}|{r['cons_md5']}|{r['idx_md5']}|{r['data_version']}"
+            for r in conn.execute(q, {"db": schema}).mappings().all()
+        }
+
+    def list_tables(self, conn, schema: str = None) -> List[dict]:
+        q = text("""
+          SELECT c.relname AS "TABLE_NAME",
+                 CASE c.relkind WHEN 'v' THEN 'VIEW' WHEN 'm' THEN 'MATERIALIZED VIEW' ELSE 'BASE TABLE' END AS "TABLE_TYPE",
+                 'postgresql' AS "ENGINE",
+                 GREATEST(c.reltuples, 0)::bigint AS "TABLE_ROWS",
+                 NULL AS "CREATE_TIME",
+                 NULL AS "UPDATE_TIME"
+          FROM pg_class c
+          JOIN pg_namespace n ON n.oid = c.relnamespace
+          WHERE n.nspname = :db AND c.relkind IN ('r', 'p', 'v', 'm')
+        """)
+        return [dict(r) for r in conn.execute(q, {"db": schema}).mappings().all()]
+
+    def columns(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        q = """
+          SELECT c.relname AS "TABLE_NAME",
+                 a.attname AS "COLUMN_NAME",
+                 a.attnum AS "ORDINAL_POSITION",
+                 format_type(a.atttypid, a.atttypmod) AS "COLUMN_TYPE",
+                 CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END AS "IS_NULLABLE",
+                 CASE WHEN pk.conkey IS NOT NULL THEN 'PRI' ELSE '' END AS "COLUMN_KEY",
+                 pg_get_expr(d.adbin, d.adrelid) AS "COLUMN_DEFAULT",
+                 CASE WHEN a.attidentity <> '' OR pg_get_expr(d.adbin, d.adrelid) LIKE 'nextval(%'
+                      THEN 'auto_increment' ELSE '' END AS "EXTRA"
+          FROM pg_attribute a
+          JOIN pg_class c ON c.oid = a.attrelid
+          JOIN pg_namespace n ON n.oid = c.relnamespace
+          LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+          LEFT JOIN pg_constraint pk ON pk.conrelid = c.oid AND pk.contype = 'p' AND a.attnum = ANY(pk.conkey)
+          WHERE n.nspname = :db AND c.relkind IN ('r', 'p', 'v', 'm')
+            AND a.attnum > 0 AND NOT a.attisdropped {table_filter}
+          ORDER BY c.relname, a.attnum
+        """
+        return self._run(conn, q, schema, table, "c.relname")
+
+    def foreign_keys(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        q = """
+          SELECT cl.relname AS "TABLE_NAME",
+                 con.conname AS "CONSTRAINT_NAME",
+                 a.attname AS "COLUMN_NAME",
+                 rcl.relname AS "REFERENCED_TABLE_NAME",
+                 ra.attname AS "REFERENCED_COLUMN_NAME"
+          FROM pg_constraint con
+          JOIN pg_class cl ON cl.oid = con.conrelid
+          JOIN pg_namespace n ON n.oid = cl.relnamespace
+          JOIN pg_class rcl ON rcl.oid = con.confrelid
+          CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(col, rcol)
+          JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.col
+          JOIN pg_attribute ra ON ra.attrelid = con.confrelid AND ra.attnum = k.rcol
+          WHERE con.contype = 'f' AND n.nspname = :db {table_filter}
+        """
+        return self._run(conn, q, schema, table, "cl.relname")
+
+    def indexes(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        q = """
+          SELECT t.relname AS "TABLE_NAME",
+                 i.relname AS "Key_name",
+                 CASE WHEN ix.indisunique THEN 0 ELSE 1 END AS "Non_unique",
+                 a.attname AS "Column_name"
+          FROM pg_index ix
+          JOIN pg_class t ON t.oid = ix.indrelid
+          JOIN pg_class i ON i.oid = ix.indexrelid
+          JOIN pg_namespace n ON n.oid = t.relnamespace
+          CROSS JOIN LATERAL unnest(ix.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+          JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+          WHERE n.nspname = :db {table_filter}
+          ORDER BY t.relname, i.relname, k.ord
+        """
+        return self._run(conn, q, schema, table, "t.relname")
+
+    def _run(self, conn, q: str, schema: str, table: str, table_col: str):
+        params = {"db": schema}
+        if table:
+            params["table"] = table
+        q = q.format(table_filter=f"AND {table_col} = :table" if table else "")
+        return _group(conn.execute(text(q), params).mappings().all())
+
+
+# ---------------------------------------------------------------------
+# SQLite: sqlite_master + table-valued pragma functions (SQLite >= 3.16)
+# ---------------------------------------------------------------------
+class SQLiteDialect(Dialect):
+    name = "sqlite"
+    sql_name = "SQLite"
+
+    def default_schema(self, engine):
+        return None
+
+    def truncate(self, expr: str, max_chars: int) -> str:
+        return f"SUBSTR(CAST({expr} AS TEXT), 1, {int(max_chars)})"
+
+    def table_fingerprints(self, conn, schema: str = None, include_data: bool = False) -> Dict[str, str]:
+        # the stored DDL is the schema (table DDL carries PK/FK; CREATE INDEX rows are
+        # separate and grouped by tbl_name); SQLite keeps no data-change marker
+        q = text("""
+          SELECT tbl_name, sql FROM sqlite_master
+          WHERE type IN ('table', 'view', 'index') AND name NOT LIKE 'sqlite_%'
+          ORDER BY tbl_name, type DESC, name
+        """)
+        ddl = {}
+        for tbl_name, sql in conn.execute(q).all():
+            ddl.setdefault(tbl_name, []).append(sql or "")
+        return {
+            name: hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+            for name, parts in ddl.items()
+        }
+
+    def data_marker(self, conn, table: str, schema: str = None, scan_rows: int = 10000) -> str:
+        # MAX(rowid) is a b-tree lookup and moves on inserts; the capped count catches deletes
+        source = self.qualified(table, schema)
+        q = text(f"SELECT (SELECT MAX(rowid) FROM {source}), "
+                 f"(SELECT COUNT(*) FROM (SELECT 1 FROM {source} LIMIT :scan) s)")
+        try:
+            max_rowid, n = conn.execute(q, {"scan": scan_rows}).one()
+        except Exception:
+            return super().data_marker(conn, table, schema, scan_rows)  # WITHOUT ROWID table
+        return f"{max_rowid}:{n}"
+
+    def list_tables(self, conn, schema: str = None) -> List[dict]:
+        q = text("""
+          SELECT name AS TABLE_NAME,
+                 CASE type WHEN 'view' THEN 'VIEW' ELSE 'BASE TABLE' END AS TABLE_TYPE,
+                 'sqlite' AS ENGINE,
+                 NULL AS TABLE_ROWS,
+                 NULL AS CREATE_TIME,
+                 NULL AS UPDATE_TIME
+          FROM sqlite_master
+          WHERE type IN ('table', 'view') AND name NOT LIKE 'sqlite_%'
+          ORDER BY name
+        """)
+        return [dict(r) for r in conn.execute(q).mappings().all()]
+
+    def columns(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        q = """
+          SELECT m.name AS TABLE_NAME,
+                 p.name AS COLUMN_NAME,
+                 p.cid + 1 AS ORDINAL_POSITION,
+                 p.type AS COLUMN_TYPE,
+                 CASE WHEN p."notnull" THEN 'NO' ELSE 'YES' END AS IS_NULLABLE,
+                 CASE WHEN p.pk > 0 THEN 'PRI' ELSE '' END AS COLUMN_KEY,
+                 p.dflt_value AS COLUMN_DEFAULT,
+                 '' AS EXTRA
+          FROM sqlite_master m
+          JOIN pragma_table_info(m.name) p
+          WHERE m.type IN ('table', 'view') AND m.name NOT LIKE 'sqlite_%' {table_filter}
+          ORDER BY m.name, p.cid
+        """
+        return self._run(conn, q, table)
+
+    def foreign_keys(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        q = """
+          SELECT m.name AS TABLE_NAME,
+                 'fk_' || m.name || '_' || f.id AS CONSTRAINT_NAME,
+                 f."from" AS COLUMN_NAME,
+                 f."table" AS REFERENCED_TABLE_NAME,
+                 f."to" AS REFERENCED_COLUMN_NAME
+          FROM sqlite_master m
+          JOIN pragma_foreign_key_list(m.name) f
+          WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' {table_filter}
+          ORDER BY m.name, f.id, f.seq
+        """
+        return self._run(conn, q, table)
+
+    def indexes(self, conn, schema: str = None, table: str = None) -> Dict[str, List[dict]]:
+        q = """
+          SELECT m.name AS TABLE_NAME,
+                 il.name AS Key_name,
+                 1 - il."unique" AS Non_unique,
+                 ii.name AS Column_name
+          FROM sqlite_master m
+          JOIN pragma_index_list(m.name) il
+          JOIN pragma_index_info(il.name) ii
+          WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' {table_filter}
+          ORDER BY m.name, il.name, ii.seqno
+        """
+        return self._run(conn, q, table)
+
+    def _run(self, conn, q: str, table: str):
+        params = {"table": table} if table else {}
+        q = q.format(table_filter="AND m.name = :table" if table else "")
+        return _group(conn.execute(text(q), params).mappings().all())
+
+
+DIALECTS = {
+    "mysql": MySQLDialect,
+    "mariadb": MySQLDialect,
+    "postgresql": PostgresDialect,
+    "sqlite": SQLiteDialect,
+}
+
+
+def get_dialect(engine) -> Dialect:
+    """Picks the metadata dialect for an engine; unknown backends use SQLAlchemy inspect()."""
+    return DIALECTS.get(engine.dialect.name, Dialect)()
@@ -1,8 +1,57 @@
 # src/embeddings_client.py
+import atexit
+import os
 from sentence_transformers import SentenceTransformer
+from src.config import EMBED_BATCH, EMBED_PROCESSES, LOCAL_EMBED_MODEL
+
+model = SentenceTransformer(LOCAL_EMBED_MODEL)
+
+THREAD_ENV = ("OMP_NUM_THREADS", "MKL_NUM_THREADS")
+
+# Multi-process encoding pool for index builds (EMBED_PROCESSES > 1). Started on
+# first use and stopped at the end of each build (upsert_table_docs), so no
+# model-holding workers outlive it.
+_pool = None
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
 
 def embed_texts(texts):
     """Generate local embeddings using sentence-transformers."""
     return model.encode(texts, convert_to_numpy=True).tolist()
+
+
+def _get_pool(processes: int):
+    global _pool
+    if _pool is None:
+        # Spawned workers read the thread settings when torch loads: split the
+        # cores between them instead of each starting one thread per core.
+        threads = str(max(1, (os.cpu_count() or 1) // processes))
+        saved = {k: os.environ.get(k) for k in THREAD_ENV}
+        os.environ.update({k: threads for k in THREAD_ENV})
+        try:
+            _pool = model.start_multi_process_pool(target_devices=["cpu"] * processes)
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+        atexit.register(stop_pool)
+    return _pool
+
+
+def stop_pool():
+    global _pool
+    if _pool is not None:
+        model.stop_multi_process_pool(_pool)
+        _pool = None
+
+
+def embed_documents(texts, processes: int = EMBED_PROCESSES):
+    """
+    Bulk encoding for index builds: returns a float32 array. With
+    processes > 1 the texts are split across worker processes.
+    """
+    if processes > 1 and len(texts) > EMBED_BATCH:
+        chunk_size = max(EMBED_BATCH, len(texts) // (processes * 4))
+        return model.encode_multi_process(texts, _get_pool(processes), batch_size=EMBED_BATCH, chunk_size=chunk_size)
+    return model.encode(texts, batch_size=EMBED_BATCH, convert_to_numpy=True)
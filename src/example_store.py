@@ -0,0 +1,213 @@
+# src/example_store.py
+import hashlib
+import re
+from typing import List, Dict
+from src.config import DB_LABEL, FEW_SHOT_K, FEW_SHOT_TOKEN_BUDGET, FEW_SHOT_MAX_DISTANCE
+from src.embeddings_client import embed_texts
+from src.query_log import read_events
+from src.vector_store import client
+from src import tracing
+
+# ---------------------------------------------------------------------
+# Starter examples for the demo schema (seed/generate_test_data.py). Only
+# seeded with include_defaults=True; other databases never see them.
+# ---------------------------------------------------------------------
+DEFAULT_EXAMPLES = [
+    {
+        "question": "List all employee names and their departments.",
+        "sql": "SELECT e.name, d.name AS department_name\n"
+               "FROM employees e\n"
+               "JOIN departments d ON e.department_id = d.id;",
+        "tables": ["employees", "departments"],
+    },
+    {
+        "question": "Find the total sales amount per customer.",
+        "sql": "SELECT c.name AS customer_name, SUM(o.total_amount) AS total_sales\n"
+               "FROM customers c\n"
+               "JOIN orders o ON c.id = o.customer_id\n"
+               "GROUP BY c.name;",
+        "tables": ["customers", "orders"],
+    },
+    {
+        "question": "Get the average salary of employees in each department.",
+        "sql": "SELECT d.name AS department_name, AVG(e.salary) AS avg_salary\n"
+               "FROM employees e\n"
+               "JOIN departments d ON e.department_id = d.id\n"
+               "GROUP BY d.name;",
+        "tables": ["employees", "departments"],
+    },
+    {
+        "question": "Fetch top 5 most ordered items.",
+        "sql": "SELECT p.id AS product_id, p.name AS product_name, COUNT(oi.id) AS order_count\n"
+               "FROM order_items oi\n"
+               "JOIN products p ON oi.product_id = p.id\n"
+               "GROUP BY p.id, p.name\n"
+               "ORDER BY order_count DESC\n"
+               "LIMIT 5;",
+        "tables": ["order_items", "products"],
+    },
+]
+
+TABLE_RE = re.compile(r"(?i)\b(?:FROM|JOIN)\s+`?([A-Za-z_][\w$]*)`?")
+
+
+# Collection handles and sizes, so selection does not hit Chroma's catalog per request
+_collections: Dict[str, object] = {}
+_counts: Dict[str, int] = {}
+
+
+def _collection(collection_name: str = None):
+    name = collection_name or f"examples_{DB_LABEL}"
+    col = _collections.get(name)
+    if col is None:
+        col = _collections[name] = client.get_or_create_collection(name)
+        _counts[name] = col.count()
+    return col
+
+
+def _example_id(question: str) -> str:
+    return "ex::" + hashlib.sha256(question.strip().lower().encode("utf-8")).hexdigest()[:16]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 chars/token) used for the prompt budget."""
+    return max(1, len(text) // 4)
+
+
+def tables_in_sql(sql: str) -> List[str]:
+    """Best-effort list of tables referenced in FROM/JOIN clauses."""
+    seen = []
+    for t in TABLE_RE.findall(sql):
+        if t not in seen:
+            seen.append(t)
+    return seen
+
+
+# ---------------------------------------------------------------------
+# Writing examples
+# ---------------------------------------------------------------------
+def add_examples(examples: List[Dict], source: str = "manual", collection_name: str = None,
+                 embeddings: list = None):
+    """
+    Upserts question/SQL examples into the example store.
+
+    Args:
+        examples: list of {"question": str, "sql": str, "tables": list[str] (optional)}
+        source: free-form tag stored in metadata (e.g. "default", "log", "validated")
+        embeddings: precomputed question embeddings, aligned with `examples`
+    """
+    examples = [e for e in examples if e.get("question") and e.get("sql")]
+    if not examples:
+        return {"count": 0}
+
+    if embeddings is not None and len(embeddings) != len(examples):
+        embeddings = None
+
+    # de-duplicate by question; the last occurrence wins
+    by_id = {_example_id(e["question"]): (i, e) for i, e in enumerate(examples)}
+    ids = list(by_id.keys())
+    questions = [e["question"].strip() for _, e in by_id.values()]
+    metadatas = [
+        {
+            "sql": e["sql"].strip(),
+            "tables": ",".join(e.get("tables") or tables_in_sql(e["sql"])),
+            "source": source,
+        }
+        for _, e in by_id.values()
+    ]
+    if embeddings is not None:
+        embeddings = [embeddings[i] for i, _ in by_id.values()]
+    else:
+        embeddings = embed_texts(questions)
+
+    col = _collection(collection_name)
+    col.upsert(ids=ids, documents=questions, metadatas=metadatas, embeddings=embeddings)
+    _counts[col.name] = col.count()
+    return {"count": len(ids)}
+
+
+def parse_legacy_log(path: str = "generated_queries.log") -> List[Dict]:
+    """Parses question/SQL pairs out of the old free-text generated_queries.log."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return []
+
+    pattern = re.compile(r"Question:\s*(.+?)\nGenerated SQL:\n(.+?)\n---", re.DOTALL)
+    return [{"question": q.strip(), "sql": s.strip()} for q, s in pattern.findall(content)]
+
+
+def logged_examples() -> List[Dict]:
+    """Question/SQL pairs from the structured query log that executed without error."""
+    return [
+        {"question": e["question"], "sql": e["sql"]}
+        for e in read_events()
+        if e.get("sql") and not e.get("error") and e.get("row_count") is not None
+    ]
+
+
+def seed_examples(legacy_log_path: str = "generated_queries.log", include_defaults: bool = False):
+    """Seeds the store from previously logged queries (and DEFAULT_EXAMPLES for the demo schema)."""
+    total = 0
+    if include_defaults:
+        total += add_examples(DEFAULT_EXAMPLES, source="default")["count"]
+    total += add_examples(parse_legacy_log(legacy_log_path), source="log")["count"]
+    total += add_examples(logged_examples(), source="log")["count"]
+    print(f"✅ Seeded {total} few-shot examples.")
+    return {"count": total}
+
+
+# ---------------------------------------------------------------------
+# Prompt-time selection
+# ---------------------------------------------------------------------
+def select_examples(question: str, n: int = FEW_SHOT_K, token_budget: int = FEW_SHOT_TOKEN_BUDGET,
+                    query_embedding: list = None, collection_name: str = None,
+                    tables: List[str] = None) -> List[Dict]:
+    """
+    Returns the top-n stored examples most similar to `question`, dropping
+    anything beyond FEW_SHOT_MAX_DISTANCE or the token budget. With `tables`
+    (the tables in the retrieved schema docs), examples that use any other
+    table are skipped, so the prompt never shows SQL for tables it lacks.
+    """
+    col = _collection(collection_name)
+    count = _counts.get(col.name, 0)
+    if count == 0 or n <= 0:
+        return []
+
+    q_emb = query_embedding if query_embedding is not None else embed_texts([question])[0]
+    allowed = {t.lower() for t in tables if t} if tables is not None else None
+    with tracing.span("example_query"):
+        results = col.query(
+            query_embeddings=[q_emb],
+            # over-fetch so the table filter still leaves up to n candidates
+            n_results=min(n * 3 if allowed is not None else n, count),
+            include=["metadatas", "documents", "distances"]
+        )
+
+    selected, used = [], 0
+    for doc, meta, dist in zip(results["documents"][0], results["metadatas"][0], results["distances"][0]):
+        if len(selected) >= n:
+            break
+        if dist > FEW_SHOT_MAX_DISTANCE:
+            continue
+        used_tables = [t for t in (meta.get("tables") or "").lower().split(",") if t]
+        if allowed is not None and not set(used_tables) <= allowed:
+            continue
+        cost = estimate_tokens(doc) + estimate_tokens(meta["sql"])
+        if used + cost > token_budget:
+            break
+        used += cost
+        selected.append({"question": doc, "sql": meta["sql"], "tables": meta.get("tables", ""), "distance": dist})
+    return selected
+
+
+def format_examples(examples: List[Dict]) -> str:
+    blocks = []
+    for i, ex in enumerate(examples, start=1):
+        blocks.append(f"Example {i}:\nUser question: {ex['question']}\nSQL: {ex['sql']}\n")
+    return "\n".join(blocks)
+
+
+if __name__ == "__main__":
+    seed_examples()
@@ -0,0 +1,209 @@
+# src/index_snapshot.py
+import argparse
+import json
+import mmap
+import os
+import shutil
+import time
+from datetime import datetime
+import numpy as np
+from chromadb import PersistentClient
+from src.config import CHROMA_DIR, DB_LABEL, LOCAL_EMBED_MODEL, SNAPSHOT_CHUNK, STATS_PATH, WATCH_SNAPSHOT_PATH
+
+# ---------------------------------------------------------------------
+# Binary snapshot of an indexed schema collection (docs + embeddings).
+#
+#   <dir>/manifest.json   collection, count, dim, model, created_at
+#   <dir>/embeddings.npy  float32 [count, dim]
+#   <dir>/docs.bin        UTF-8 chunk texts, back to back
+#   <dir>/offsets.npy     int64 [count + 1] byte offsets into docs.bin
+#   <dir>/meta.json       ids + metadatas (compact JSON)
+#   <dir>/column_stats.json, schema_snapshot.json
+#                         value dictionaries and watcher baseline, if present
+#
+# Loading memory-maps embeddings.npy / docs.bin and upserts in slices, so a
+# replica warms its index without the database, the encoder or a full parse.
+# This module deliberately avoids importing the embedding model.
+# ---------------------------------------------------------------------
+FORMAT_VERSION = 1
+
+# Side files carried along with the index: snapshot file name -> local path
+STATE_FILES = {"column_stats.json": STATS_PATH, "schema_snapshot.json": WATCH_SNAPSHOT_PATH}
+
+client = PersistentClient(path=CHROMA_DIR)
+
+
+def _collection_name(name: str = None) -> str:
+    return name or f"schema_{DB_LABEL}"
+
+
+def _copy_atomic(src: str, dst: str):
+    tmp = dst + ".tmp"
+    shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _restore_state(path: str, manifest: dict):
+    for name in manifest.get("state_files", []):
+        _copy_atomic(os.path.join(path, name), STATE_FILES[name])
+
+
+def export_snapshot(path: str, collection_name: str = None, page: int = SNAPSHOT_CHUNK) -> dict:
+    """Writes the collection to `path`, paging through Chroma so memory stays at one page."""
+    collection_name = _collection_name(collection_name)
+    col = client.get_collection(collection_name)
+    count = col.count()
+    os.makedirs(path, exist_ok=True)
+    t0 = time.perf_counter()
+
+    emb = None
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    ids, metadatas = [], []
+    pos = 0
+    with open(os.path.join(path, "docs.bin"), "wb") as docs_f:
+        for start in range(0, count, page):
+            res = col.get(limit=page, offset=start, include=["embeddings", "documents", "metadatas"])
+            batch = np.asarray(res["embeddings"], dtype=np.float32)
+            if emb is None:
+                emb = np.lib.format.open_memmap(
+                    os.path.join(path, "embeddings.npy"), mode="w+", dtype=np.float32, shape=(count, batch.shape[1])
+                )
+            emb[start:start + len(batch)] = batch
+            for j, doc in enumerate(res["documents"]):
+                raw = (doc or "").encode("utf-8")
+                docs_f.write(raw)
+                pos += len(raw)
+                offsets[start + j + 1] = pos
+            ids.extend(res["ids"])
+            metadatas.extend(res["metadatas"])
+
+    dim = int(emb.shape[1]) if emb is not None else 0
+    if emb is not None:
+        emb.flush()
+        del emb
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "metadatas": metadatas}, f, separators=(",", ":"), default=str)
+
+    state_files = []
+    for name, local in STATE_FILES.items():
+        if os.path.exists(local):
+            _copy_atomic(local, os.path.join(path, name))
+            state_files.append(name)
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "collection": collection_name,
+        "count": count,
+        "dim": dim,
+        "model": LOCAL_EMBED_MODEL,
+        "state_files": state_files,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"📦 Exported {count} chunks from '{collection_name}' to {path} in {time.perf_counter() - t0:.1f}s")
+    return manifest
+
+
+def _read_snapshot(path: str, manifest: dict):
+    """Opens and cross-checks every snapshot file; raises before anything is written."""
+    count = manifest["count"]
+    for name in manifest.get("state_files", []):
+        if name not in STATE_FILES or not os.path.isfile(os.path.join(path, name)):
+            raise ValueError(f"Snapshot at {path} is missing state file '{name}'")
+    if not count:
+        return None, None, None
+    emb = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+    offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+    with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    size = os.path.getsize(os.path.join(path, "docs.bin"))
+    if (
+        emb.shape != (count, manifest["dim"])
+        or len(offsets) != count + 1
+        or offsets[0] != 0 or offsets[-1] != size or np.any(np.diff(offsets) < 0)
+        or len(meta.get("ids", [])) != count
+        or len(meta.get("metadatas", [])) != count
+    ):
+        raise ValueError(f"Snapshot at {path} does not match its manifest")
+    return emb, offsets, meta
+
+
+def _upsert_snapshot(col, path: str, emb, offsets, meta, chunk: int):
+    count = len(meta["ids"])
+    with open(os.path.join(path, "docs.bin"), "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        docs = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            for start in range(0, count, chunk):
+                end = min(start + chunk, count)
+                col.upsert(
+                    ids=meta["ids"][start:end],
+                    metadatas=meta["metadatas"][start:end],
+                    documents=[
+                        docs[int(offsets[i]):int(offsets[i + 1])].decode("utf-8") for i in range(start, end)
+                    ],
+                    embeddings=emb[start:end].tolist(),
+                )
+        finally:
+            if size:
+                docs.close()
+
+
+def load_snapshot(path: str, collection_name: str = None, replace: bool = True, chunk: int = SNAPSHOT_CHUNK) -> dict:
+    """
+    Rebuilds the collection from a snapshot directory without encoding anything.
+    With replace=True the chunks go into a side collection that is swapped in
+    only once every chunk has loaded; on any error the live index is untouched.
+    """
+    with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+    if manifest.get("model") != LOCAL_EMBED_MODEL:
+        # query embeddings would come from a different model and never match these vectors
+        raise ValueError(
+            f"Snapshot was embedded with '{manifest.get('model')}', this node uses '{LOCAL_EMBED_MODEL}'"
+        )
+    collection_name = collection_name or manifest["collection"]
+    count = manifest["count"]
+    t0 = time.perf_counter()
+    emb, offsets, meta = _read_snapshot(path, manifest)
+
+    if not replace:
+        col = client.get_or_create_collection(collection_name)
+        if count:
+            _upsert_snapshot(col, path, emb, offsets, meta, chunk)
+    else:
+        loading = f"{collection_name}__loading"
+        if loading in [c.name for c in client.list_collections()]:
+            client.delete_collection(loading)  # left over from an interrupted load
+        col = client.create_collection(loading)
+        try:
+            if count:
+                _upsert_snapshot(col, path, emb, offsets, meta, chunk)
+        except Exception:
+            client.delete_collection(loading)
+            raise
+        # Chroma has no atomic rename-over: drop the old collection, then rename
+        if collection_name in [c.name for c in client.list_collections()]:
+            client.delete_collection(collection_name)
+        col.modify(name=collection_name)
+
+    _restore_state(path, manifest)
+    print(f"⚡ Loaded {count} chunks into '{collection_name}' from {path} in {time.perf_counter() - t0:.1f}s")
+    return {"collection": collection_name, "count": count}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or load a binary schema index snapshot")
+    parser.add_argument("action", choices=["export", "load"])
+    parser.add_argument("path")
+    parser.add_argument("--collection", help="Chroma collection (default: schema_<db> / from manifest)")
+    args = parser.parse_args()
+
+    if args.action == "export":
+        export_snapshot(args.path, args.collection)
+    else:
+        load_snapshot(args.path, args.collection)
@@ -0,0 +1,186 @@
+# src/query_log.py
+import argparse
+import atexit
+import json
+import os
+import queue
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+from src.config import QUERY_LOG_PATH, QUERY_LOG_MAX_BYTES, QUERY_LOG_BACKUPS, QUERY_LOG_BATCH
+from src.tracing import percentile
+
+
+# ---------------------------------------------------------------------
+# Background JSON-lines writer
+# ---------------------------------------------------------------------
+class QueryLogWriter:
+    """
+    Appends events as JSON lines from a single background thread.
+    `log()` never blocks the caller: events are queued and written in
+    batches; if the queue is full the event is dropped and counted.
+    Files rotate like logging.RotatingFileHandler (path, path.1, ...).
+    """
+
+    def __init__(self, path: str = QUERY_LOG_PATH, max_bytes: int = QUERY_LOG_MAX_BYTES,
+                 backup_count: int = QUERY_LOG_BACKUPS, batch_size: int = QUERY_LOG_BATCH,
+                 flush_interval: float = 1.0, max_queue: int = 10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, event: Dict):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    print(f"⚠️ Query log write failed ({len(batch)} events): {e}")
+
+    def _write(self, batch: List[Dict]):
+        data = "".join(json.dumps(e, default=str, separators=(",", ":")) + "\n" for e in batch)
+        if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def _rotate(self):
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> QueryLogWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = QueryLogWriter()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def log_event(event: Dict):
+    """Queues one query event; adds a timestamp if missing."""
+    event.setdefault("ts", datetime.utcnow().isoformat())
+    get_writer().log(event)
+
+
+# ---------------------------------------------------------------------
+# Reading / reporting
+# ---------------------------------------------------------------------
+def read_events(path: str = QUERY_LOG_PATH, include_rotated: bool = True) -> List[Dict]:
+    """Returns logged events, oldest first (rotated files included)."""
+    paths = []
+    if include_rotated:
+        paths = [f"{path}.{i}" for i in range(QUERY_LOG_BACKUPS, 0, -1)]
+    paths.append(path)
+
+    events = []
+    for p in paths:
+        if not os.path.exists(p):
+            continue
+        with open(p, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # partially written line
+    return events
+
+
+def summarize(events: List[Dict]) -> Dict:
+    stages = {}
+    for e in events:
+        for stage, secs in (e.get("timings") or {}).items():
+            stages.setdefault(stage, []).append(secs)
+
+    tables = Counter(t for e in events for t in set(e.get("tables") or []))
+    errors = [e for e in events if e.get("error")]
+    return {
+        "queries": len(events),
+        "errors": len(errors),
+        "k": dict(Counter(e.get("k") for e in events)),
+        "avg_prompt_tokens": sum(e.get("prompt_tokens") or 0 for e in events) / max(1, len(events)),
+        "avg_rows": sum(e.get("row_count") or 0 for e in events) / max(1, len(events)),
+        "stages": {
+            s: {"p50": percentile(v, 50), "p95": percentile(v, 95), "p99": percentile(v, 99), "n": len(v)}
+            for s, v in stages.items()
+        },
+        "top_tables": tables.most_common(10),
+    }
+
+
+def _print_report(summary: Dict):
+    print(f"📒 Queries: {summary['queries']}  errors: {summary['errors']}")
+    print(f"   k distribution: {summary['k']}")
+    print(f"   avg prompt tokens: {summary['avg_prompt_tokens']:.0f}  avg rows: {summary['avg_rows']:.1f}")
+    print("   stage latency (s):")
+    for stage, st in summary["stages"].items():
+        print(f"   - {stage:<12} p50={st['p50']:.3f} p95={st['p95']:.3f} p99={st['p99']:.3f} n={st['n']}")
+    print("   top tables:")
+    for t, n in summary["top_tables"]:
+        print(f"   - {t}: {n}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the structured NL2SQL query log")
+    parser.add_argument("command", choices=["report", "tail", "errors"])
+    parser.add_argument("--path", default=QUERY_LOG_PATH)
+    parser.add_argument("-n", type=int, default=20, help="Number of entries for tail/errors")
+    parser.add_argument("--since", type=str, help="Only include events at/after this ISO timestamp")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    events = read_events(args.path)
+    if args.since:
+        events = [e for e in events if e.get("ts", "") >= args.since]
+
+    if args.command == "report":
+        summary = summarize(events)
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            _print_report(summary)
+    else:
+        if args.command == "errors":
+            events = [e for e in events if e.get("error")]
+        for e in events[-args.n:]:
+            print(json.dumps(e, default=str))
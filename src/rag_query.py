@@ -3,8 +3,14 @@ import os
 import re
 from typing import Tuple
 from openai import OpenAI
+from src.config import EXAMPLES_AUTO_ADD
+from src.embeddings_client import embed_texts
+from src.example_store import select_examples, format_examples, add_examples, estimate_tokens
+from src.query_log import log_event
+from src.column_stats import match_values, format_value_hints
+from src import tracing
 from src.vector_store import similarity_search
-from src.sql_executor import run_select
+from src.sql_executor import run_select, dialect
 
 # Initialize OpenAI client
 openai_client = OpenAI(
@@ -12,51 +18,19 @@ openai_client = OpenAI(
     base_url=os.getenv("OPENAI_BASE_URL")
 )
 
-# ------------------------- FEW-SHOT EXAMPLES -------------------------
-FEW_SHOT_EXAMPLES = """
-Example 1:
-User question: List all employee names and their departments.
-SQL: SELECT e.name, d.name AS department_name
-     FROM employees e
-     JOIN departments d ON e.department_id = d.id;
-
-Example 2:
-User question: Find the total sales amount per customer.
-SQL: SELECT c.name AS customer_name, SUM(o.total_amount) AS total_sales
-     FROM customers c
-     JOIN orders o ON c.id = o.customer_id
-     GROUP BY c.name;
-
-Example 3:
-User question: Get the average salary of employees in each department.
-SQL: SELECT d.name AS department_name, AVG(e.salary) AS avg_salary
-     FROM employees e
-     JOIN departments d ON e.department_id = d.id
-     GROUP BY d.name;
-Example 4:
-User question: Fetch top 5 most ordered items.
-SQL: SELECT p.id AS product_id, p.name AS product_name, COUNT(oi.id) AS order_count
-     FROM order_items oi
-     JOIN products p ON oi.product_id = p.id
-     GROUP BY p.id, p.name
-     ORDER BY order_count DESC
-     LIMIT 5;
-
-"""
-
 # ------------------------- PROMPT TEMPLATE -------------------------
-PROMPT_TEMPLATE = f"""
-You are a SQL assistant that generates **accurate, readable MySQL SELECT** queries.
-
-Here are examples of correct queries:
-{FEW_SHOT_EXAMPLES}
+# Few-shot examples are picked per question from the example store
+# (see src/example_store.py) and injected via {few_shot}.
+FEW_SHOT_HEADER = "Here are examples of correct queries:\n{examples}\n---\n"
 
----
+PROMPT_TEMPLATE = """
+You are a SQL assistant that generates **accurate, readable {sql_dialect} SELECT** queries.
 
+{few_shot}
 Schema context:
-{{table_info}}
-
-User question: {{user_question}}
+{table_info}
+{value_hints}
+User question: {user_question}
 
 Guidelines:
 - Only output one valid SQL SELECT query.
@@ -71,8 +45,14 @@ Never return explanations, hints, or commentary — only the SQL statement.
 """
 
 # ------------------------- RETRIEVAL -------------------------
-def assemble_table_info(question: str, k: int) -> Tuple[str, list]:
-    docs = similarity_search(question, k=k)
+def assemble_table_info(question: str, k: int, query_embedding: list = None) -> Tuple[str, list]:
+    docs = similarity_search(question, k=k, query_embedding=query_embedding)
+    with tracing.span("context_assembly"):
+        table_info = _join_table_docs(docs)
+    return table_info, docs
+
+
+def _join_table_docs(docs: list) -> str:
     seen = set()
     parts = []
     tables_used = []
@@ -83,52 +63,47 @@ def assemble_table_info(question: str, k: int) -> Tuple[str, list]:
             seen.add(t)
             parts.append(f"---\n{d['text']}\n")
     print(f"🔎 assemble_table_info: top docs/tables used = {tables_used}")
-    return "\n".join(parts), docs
+    return "\n".join(parts)
 
 
 # ------------------------- LLM CALL -------------------------
 def call_llm(prompt: str, max_tokens: int = 256, temperature: float = 0.0):
     """Call the LLM (chat or text completion fallback)."""
-    try:
-        resp = openai_client.chat.completions.create(
-            model=os.getenv("LLM_MODEL", "gpt-4o-mini"), 
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-        return resp.choices[0].message["content"]
-    except Exception:
-        resp = openai_client.completions.create(
-            model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
-            prompt=prompt,
-            max_tokens=max_tokens,
-            temperature=temperature
-        )
-        return resp.choices[0].text
-
-# ------------------------- MAIN PIPELINE -------------------------
-def question_to_sql_and_execute(user_question: str, run_query: bool = True):
-    """Full RAG pipeline: retrieve schema context, call LLM, extract & execute SQL."""
-
-    # Dynamically adjust number of retrieved schema chunks
-    word_count = len(user_question.split())
-    k = 8 if word_count < 15 else 12
-    print(f"📚 Retrieved top {k} schema chunks for LLM context.\n")
-
-    # Step 1: Retrieve schema info for context
-    table_info, docs = assemble_table_info(user_question, k=k)
-    prompt = PROMPT_TEMPLATE.format(table_info=table_info, user_question=user_question)
-    
-    # Step 2: Get LLM output
-    raw_output = call_llm(prompt).strip()
-    # 🧩 If LLM returns only advice or no SELECT, retry once with simpler phrasing
-    if "select" not in raw_output.lower():
-        print("⚠️ LLM returned advice instead of SQL. Retrying...")
-        retry_prompt = prompt + "\nNow output only the SQL query."
-        raw_output = call_llm(retry_prompt).strip()
-
-
-    # Step 3: Clean up markdown/code fences
+    with tracing.span("llm", prompt_chars=len(prompt)) as sp:
+        try:
+            resp = openai_client.chat.completions.create(
+                model=os.getenv("LLM_MODEL", "gpt-4o-mini"), 
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            text = resp.choices[0].message.content
+        except Exception:
+            tracing.incr("llm_fallbacks")
+            resp = openai_client.completions.create(
+                model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
+                prompt=prompt,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            text = resp.choices[0].text
+        _record_usage(sp, getattr(resp, "usage", None))
+        return text
+
+
+def _record_usage(sp, usage):
+    if usage is None:
+        return
+    for field in ("prompt_tokens", "completion_tokens"):
+        n = getattr(usage, field, None)
+        if n is not None:
+            sp.set(f"llm.{field}", n)
+            tracing.incr(f"llm_{field}", n)
+
+# ------------------------- SQL EXTRACTION -------------------------
+def extract_sql(raw_output: str) -> str:
+    """Strips markdown/commentary from LLM output and returns the first SELECT."""
+    # Clean up markdown/code fences
     cleaned = (
         raw_output.replace("```sql", "")
         .replace("```", "")
@@ -136,7 +111,7 @@ def question_to_sql_and_execute(user_question: str, run_query: bool = True):
         .strip()
     )
 
-    # Step 4: Extract only the first valid SQL block (ignore explanations)
+    # Extract only the first valid SQL block (ignore explanations)
     sql_match = re.search(
         r"(?i)(SELECT[\s\S]+?)(?:;|\n\s*(?:###|#|--|$))", cleaned
     )
@@ -145,24 +120,89 @@ def question_to_sql_and_execute(user_question: str, run_query: bool = True):
     else:
         raise ValueError(f"No valid SQL found in LLM output:\n{raw_output}")
 
-    # Step 5: Remove any extra commentary lines after SQL
+    # Remove any extra commentary lines after SQL
     lines = []
     for line in sql_text.splitlines():
         if any(line.strip().startswith(x) for x in ["#", "###", "--"]):
             break
         lines.append(line)
-    sql_text = "\n".join(lines).strip()
+    return "\n".join(lines).strip()
+
+
+# ------------------------- MAIN PIPELINE -------------------------
+def question_to_sql_and_execute(user_question: str, run_query: bool = True):
+    """Full RAG pipeline: retrieve schema context, call LLM, extract & execute SQL."""
+
+    # Dynamically adjust number of retrieved schema chunks
+    word_count = len(user_question.split())
+    k = 8 if word_count < 15 else 12
+    print(f"📚 Retrieved top {k} schema chunks for LLM context.\n")
 
-    # Debug print
+    timings = {}
+    event = {"question": user_question, "k": k, "timings": timings, "error": None}
+    try:
+        with tracing.collect(timings):
+            return _run_pipeline(user_question, k, run_query, event)
+    except Exception as e:
+        event["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        # Queued for the background writer; no file I/O on the request path
+        log_event(event)
+
+
+def _run_pipeline(user_question: str, k: int, run_query: bool, event: dict):
+    # Step 1: Retrieve schema info + closest few-shot examples (one shared embedding)
+    with tracing.span("embed"):
+        q_emb = embed_texts([user_question])[0]
+    table_info, docs = assemble_table_info(user_question, k=k, query_embedding=q_emb)
+    examples = select_examples(
+        user_question, query_embedding=q_emb, tables=[d["metadata"].get("table") for d in docs]
+    )
+    with tracing.span("value_lookup"):
+        value_matches = match_values(user_question, [d["metadata"].get("table") for d in docs])
+    with tracing.span("prompt_build"):
+        few_shot = FEW_SHOT_HEADER.format(examples=format_examples(examples)) if examples else ""
+        prompt = PROMPT_TEMPLATE.format(
+            sql_dialect=dialect.sql_name, few_shot=few_shot, table_info=table_info,
+            value_hints=format_value_hints(value_matches), user_question=user_question
+        )
+    print(f"🧩 Using {len(examples)} few-shot examples.")
+    event.update({
+        "tables": [d["metadata"].get("table") for d in docs],
+        "examples": len(examples),
+        "value_hints": len(value_matches),
+        "prompt_chars": len(prompt),
+        "prompt_tokens": estimate_tokens(prompt),
+    })
+
+    # Step 2: Get LLM output
+    raw_output = call_llm(prompt).strip()
+    # 🧩 If LLM returns only advice or no SELECT, retry once with simpler phrasing
+    if "select" not in raw_output.lower():
+        print("⚠️ LLM returned advice instead of SQL. Retrying...")
+        tracing.incr("llm_retries")
+        event["llm_retry"] = True
+        retry_prompt = prompt + "\nNow output only the SQL query."
+        raw_output = call_llm(retry_prompt).strip()
+
+    # Step 3: Extract the SQL statement
+    with tracing.span("sql_extract"):
+        sql_text = extract_sql(raw_output)
+    event["sql"] = sql_text
     print(f"\n🧠 Generated SQL:\n{sql_text}\n")
-# 🪶 Log every generated SQL query to a file for debugging
-    log_entry = f"\n---\nQuestion: {user_question}\nGenerated SQL:\n{sql_text}\n---\n"
-    with open("generated_queries.log", "a", encoding="utf-8") as log_file:
-        log_file.write(log_entry)
-
-    # Step 6: Execute safely
-    if run_query:
-        rows = run_select(sql_text, limit=1000)
-        return {"sql": sql_text, "rows": rows, "sources": docs}
-    else:
+
+    # Step 4: Execute safely
+    if not run_query:
         return {"sql": sql_text, "rows": None, "sources": docs}
+
+    rows = run_select(sql_text, limit=1000)
+    event["row_count"] = len(rows)
+
+    # Opt-in: executing cleanly does not prove the SQL answers the question
+    if EXAMPLES_AUTO_ADD:
+        try:
+            add_examples([{"question": user_question, "sql": sql_text}], source="validated", embeddings=[q_emb])
+        except Exception as e:
+            print(f"⚠️ Could not store example: {e}")
+    return {"sql": sql_text, "rows": rows, "sources": docs}
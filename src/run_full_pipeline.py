@@ -1,7 +1,8 @@
 # src/run_full_pipeline.py
-from src.schema_fetcher import extract_all
-from src.vector_store import upsert_table_docs
-from src.rag_query import question_to_sql_and_execute
+# Pipeline modules are imported inside the steps that use them: importing
+# them loads the embedding model, Chroma and DB engines, which e.g.
+# --from_snapshot on a fresh replica must not pay for.
+from src import tracing
 import json
 import argparse
 from datetime import date, datetime
@@ -25,10 +26,21 @@ def build_and_index(sample_n: int = 5):
     """
     Extract schema from MySQL, create embeddings, and upsert into Chroma DB.
     """
-    docs = extract_all(sample_n)
+    from src.schema_fetcher import extract_all
+    from src.vector_store import upsert_table_docs
+    from src.schema_watcher import current_fingerprints, save_snapshot
+
+    with tracing.span("extract"):
+        docs = extract_all(sample_n)
     print(f"Extracted {len(docs)} table docs. Upserting to vector store...")
     res = upsert_table_docs(docs)
     print("✅ Upsert result:", res)
+    # Baseline for --watch, so the watcher only re-indexes tables changed after this build
+    try:
+        save_snapshot(current_fingerprints())
+    except Exception as e:
+        print(f"⚠️ Schema snapshot skipped: {e}")
+    return res
 
 
 # ---------------------------------------------------------------------
@@ -39,6 +51,8 @@ def ask(question: str):
     Query the indexed schema with a natural language question.
     Generates SQL, executes it safely, and prints results.
     """
+    from src.rag_query import question_to_sql_and_execute
+
     print(f"\n🧠 Question: {question}\n")
     out = question_to_sql_and_execute(question, run_query=True)
 
@@ -46,7 +60,9 @@ def ask(question: str):
 
     if out.get("rows") is not None:
         try:
-            print("📊 Rows:\n", json.dumps(out["rows"], indent=2, default=safe_json))
+            with tracing.span("serialization"):
+                rows_json = json.dumps(out["rows"], indent=2, default=safe_json)
+            print("📊 Rows:\n", rows_json)
         except Exception as e:
             print(f"⚠️ Could not serialize rows to JSON: {e}")
             print("Raw rows:", out["rows"])
@@ -64,9 +80,31 @@ if __name__ == "__main__":
     parser.add_argument("--build", action="store_true", help="Extract schema and upsert embeddings into Chroma")
     parser.add_argument("--ask", type=str, help="Ask a natural language question to the database")
     parser.add_argument("--sample_n", type=int, default=5, help="Number of tables to sample from the schema")
+    parser.add_argument("--seed_examples", action="store_true", help="Seed the few-shot example store from logged queries")
+    parser.add_argument("--demo_examples", action="store_true", help="With --seed_examples: also add the demo-schema starter examples")
+    parser.add_argument("--export_snapshot", metavar="DIR", help="Write the indexed schema (docs + embeddings) to a binary snapshot")
+    parser.add_argument("--from_snapshot", metavar="DIR", help="Build the index from a snapshot (no database access, no encoding)")
+    parser.add_argument("--watch", action="store_true", help="Poll the schema and re-index only changed tables")
+    parser.add_argument("--interval", type=float, default=60, help="Seconds between schema polls (with --watch)")
+    parser.add_argument("--metrics_port", type=int, help="Expose Prometheus metrics on this port (TRACING_BACKEND=prometheus)")
     args = parser.parse_args()
 
+    if args.metrics_port:
+        tracing.start_metrics_server(args.metrics_port)
+
+    if args.from_snapshot:
+        from src.index_snapshot import load_snapshot
+        load_snapshot(args.from_snapshot)
     if args.build:
         build_and_index(args.sample_n)
+    if args.export_snapshot:
+        from src.index_snapshot import export_snapshot
+        export_snapshot(args.export_snapshot)
+    if args.seed_examples:
+        from src.example_store import seed_examples
+        seed_examples(include_defaults=args.demo_examples)
     if args.ask:
         ask(args.ask)
+    if args.watch:
+        from src.schema_watcher import run_watcher
+        run_watcher(args.interval, args.sample_n)
@@ -3,72 +3,92 @@ import hashlib
 import json
 from datetime import datetime
 from sqlalchemy import create_engine, text
-from src.config import DB_URI
-import pandas as pd
+from src.config import DB_URI, DB_LABEL, SAMPLE_MODE, SAMPLE_MAX_CHARS, SAMPLE_MAX_COLS, STATS_ENABLED
+from src.dialects import get_dialect, sample_columns
+from src.column_stats import update_stats
 
 engine = create_engine(DB_URI, pool_pre_ping=True, future=True)
+dialect = get_dialect(engine)
+
+# Tables neither indexed by --build nor tracked by the schema watcher
+SKIP_PREFIXES = ("sys_", "tmp_", "backup_", "test_")
 
 def compute_hash(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 def list_tables(schema: str = None):
-    schema = schema or engine.url.database
-    q = text("""
-      SELECT TABLE_NAME, TABLE_TYPE, ENGINE, TABLE_ROWS, CREATE_TIME
-      FROM information_schema.tables
-      WHERE TABLE_SCHEMA = :db
-    """)
+    schema = schema or dialect.default_schema(engine)
     with engine.connect() as conn:
-        res = conn.execute(q, {"db": schema}).mappings().all()
-    return [dict(r) for r in res]
+        return dialect.list_tables(conn, schema)
 
 def get_columns(table: str, schema: str = None):
-    schema = schema or engine.url.database
-    q = text("""
-      SELECT COLUMN_NAME, ORDINAL_POSITION, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA
-      FROM information_schema.columns
-      WHERE TABLE_SCHEMA = :db AND TABLE_NAME = :table
-      ORDER BY ORDINAL_POSITION
-    """)
+    schema = schema or dialect.default_schema(engine)
     with engine.connect() as conn:
-        res = conn.execute(q, {"db": schema, "table": table}).mappings().all()
-    return [dict(r) for r in res]
+        return dialect.columns(conn, schema, table).get(table, [])
 
 def get_foreign_keys(table: str, schema: str = None):
-    schema = schema or engine.url.database
-    q = text("""
-      SELECT CONSTRAINT_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
-      FROM information_schema.key_column_usage
-      WHERE TABLE_SCHEMA = :db AND TABLE_NAME = :table AND REFERENCED_TABLE_NAME IS NOT NULL
-    """)
+    schema = schema or dialect.default_schema(engine)
     with engine.connect() as conn:
-        res = conn.execute(q, {"db": schema, "table": table}).mappings().all()
-    return [dict(r) for r in res]
+        return dialect.foreign_keys(conn, schema, table).get(table, [])
 
-def get_indexes(table: str):
-    q = text(f"SHOW INDEX FROM `{engine.url.database}`.`{table}`")
+def get_indexes(table: str, schema: str = None):
+    schema = schema or dialect.default_schema(engine)
     with engine.connect() as conn:
         try:
-            res = conn.execute(q).mappings().all()
-            return [dict(r) for r in res]
+            return dialect.indexes(conn, schema, table).get(table, [])
         except Exception:
             return []
 
-def sample_rows(table: str, n: int = 5):
-    q = text(f"SELECT * FROM `{table}` LIMIT :n")
+def get_all_metadata(schema: str = None):
+    """Columns, FKs and indexes for every table in three bulk queries."""
+    schema = schema or dialect.default_schema(engine)
     with engine.connect() as conn:
+        cols = dialect.columns(conn, schema)
+        fks = dialect.foreign_keys(conn, schema)
         try:
-            df = pd.read_sql(q, conn, params={"n": n})
-            return df.fillna("").astype(str).to_dict(orient="records")
+            idxs = dialect.indexes(conn, schema)
+        except Exception:
+            idxs = {}
+    return cols, fks, idxs
+
+def _sample_value(v):
+    if v is None:
+        return ""
+    if isinstance(v, (bytes, bytearray, memoryview)):
+        return "<binary>"
+    return str(v)
+
+def sample_rows(table: str, n: int = 5, schema: str = None, cols: list = None, mode: str = SAMPLE_MODE):
+    """
+    Fetches up to n sample rows as {column: str}. With `cols` (from get_columns),
+    binary columns are skipped, at most SAMPLE_MAX_COLS columns are projected and
+    text values are cut to SAMPLE_MAX_CHARS by the database, so the transfer
+    size depends on the column count rather than the row width.
+    """
+    if n <= 0:
+        return []
+    cols = sample_columns(cols, SAMPLE_MAX_COLS) if cols else None
+    sql, params = dialect.sample_query(table, n, schema, mode=mode, cols=cols, max_chars=SAMPLE_MAX_CHARS)
+    with engine.connect() as conn:
+        try:
+            res = conn.execute(text(sql), params)
+            keys = list(res.keys())
+            rows = [{k: _sample_value(v) for k, v in zip(keys, row)} for row in res.fetchmany(n)]
         except Exception:
             return []
+    if mode == "tablesample" and dialect.supports_tablesample and len(rows) < n:
+        # block sampling can come back short on small tables; elsewhere the
+        # query above already was a plain "first" read
+        return sample_rows(table, n, schema, cols, mode="first")
+    return rows
 
-def build_table_doc(table_meta: dict, sample_n: int = 5) -> dict:
+def build_table_doc(table_meta: dict, sample_n: int = 5, cols=None, fks=None, idxs=None) -> dict:
+    """Builds the doc for one table; pass cols/fks/idxs from get_all_metadata() to skip per-table queries."""
     table = table_meta["TABLE_NAME"]
-    cols = get_columns(table)
-    fks = get_foreign_keys(table)
-    idxs = get_indexes(table)
-    samples = sample_rows(table, sample_n)
+    cols = get_columns(table) if cols is None else cols
+    fks = get_foreign_keys(table) if fks is None else fks
+    idxs = get_indexes(table) if idxs is None else idxs
+    samples = sample_rows(table, sample_n, cols=cols)
     parts = []
     parts.append(f"Table: {table}")
     parts.append(f"Engine: {table_meta.get('ENGINE')} Rows(estimate): {table_meta.get('TABLE_ROWS')}")
@@ -90,7 +110,7 @@ def build_table_doc(table_meta: dict, sample_n: int = 5) -> dict:
     full_text = "\n".join(parts)
     return {
         "table": table,
-        "db": engine.url.database,
+        "db": DB_LABEL,
         "text": full_text,
         "schema_hash": compute_hash(full_text),
         "created_at": datetime.utcnow().isoformat(),
@@ -105,29 +125,42 @@ def build_table_doc(table_meta: dict, sample_n: int = 5) -> dict:
 #     for t in tables:
 #         docs.append(build_table_doc(t, sample_n))
 #     return docs
-def extract_all(sample_n: int = 5, skip_system: bool = True):
-    schema = engine.url.database
+def extract_all(sample_n: int = 5, skip_system: bool = True, collect_stats: bool = STATS_ENABLED):
+    schema = dialect.default_schema(engine)
     tables = list_tables(schema)
     total = len(tables)
-    print(f"📦 Found {total} tables in database '{schema}'")
+    print(f"📦 Found {total} tables in database '{DB_LABEL}' ({dialect.sql_name})")
+    all_cols, all_fks, all_idxs = get_all_metadata(schema)
 
     docs = []
+    kept = []
     for i, t in enumerate(tables, start=1):
         name = t["TABLE_NAME"]
-        if skip_system and name.startswith(("sys_", "tmp_", "backup_", "test_")):
+        if skip_system and name.startswith(SKIP_PREFIXES):
             print(f"⏭️  Skipping system/temporary table: {name}")
             continue
+        kept.append(t)
         print(f"🔹 [{i}/{total}] Processing table: {name}")
         try:
-            doc = build_table_doc(t, sample_n)
+            doc = build_table_doc(
+                t, sample_n,
+                cols=all_cols.get(name, []), fks=all_fks.get(name, []), idxs=all_idxs.get(name, [])
+            )
             docs.append(doc)
         except Exception as e:
             print(f"⚠️ Error processing {name}: {e}")
     print(f"✅ Extracted {len(docs)} table docs successfully.")
+
+    # Value dictionaries for low-cardinality string columns (incremental)
+    if collect_stats:
+        try:
+            update_stats(engine, dialect, kept, all_cols, schema)
+        except Exception as e:
+            print(f"⚠️ Column stats skipped: {e}")
     return docs
 
 if __name__ == "__main__":
     docs = extract_all(5)
     print(f"Extracted {len(docs)} tables")
     with open("extracted_table_docs.json", "w", encoding="utf-8") as f:
-        json.dump(docs, f, indent=2)
+        json.dump(docs, f, separators=(",", ":"), default=str)
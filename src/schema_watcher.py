@@ -0,0 +1,146 @@
+# src/schema_watcher.py
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict
+from src.config import WATCH_INTERVAL, WATCH_SNAPSHOT_PATH, WATCH_DATA_CHANGES, STATS_ENABLED
+from src.schema_fetcher import (
+    engine, dialect, DB_LABEL, SKIP_PREFIXES, list_tables, get_columns, get_foreign_keys, get_indexes, build_table_doc
+)
+from src.vector_store import upsert_table_docs, delete_table_docs, delete_stale_docs
+from src.column_stats import update_stats, forget_tables
+
+# ---------------------------------------------------------------------
+# Polls one cheap fingerprint query per interval (column checksums +
+# create/update times, see Dialect.table_fingerprints), diffs it against
+# the snapshot on disk and re-extracts / re-embeds only changed tables.
+# ---------------------------------------------------------------------
+
+
+def current_fingerprints() -> Dict[str, str]:
+    schema = dialect.default_schema(engine)
+    with engine.connect() as conn:
+        fps = dialect.table_fingerprints(conn, schema, include_data=WATCH_DATA_CHANGES)
+    return {t: fp for t, fp in fps.items() if not t.startswith(SKIP_PREFIXES)}
+
+
+def load_snapshot(path: str = WATCH_SNAPSHOT_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("tables")
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_snapshot(fingerprints: Dict[str, str], path: str = WATCH_SNAPSHOT_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"db": DB_LABEL, "taken_at": datetime.utcnow().isoformat(), "tables": fingerprints},
+                  f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def diff(old: Dict[str, str], new: Dict[str, str]):
+    added = sorted(set(new) - set(old))
+    removed = sorted(set(old) - set(new))
+    changed = sorted(t for t in set(old) & set(new) if old[t] != new[t])
+    return added, changed, removed
+
+
+def reindex_tables(tables, removed, sample_n: int = 5):
+    """
+    Re-extracts and re-embeds `tables`, then drops the chunks they replace
+    and every chunk of `removed`. Returns the tables that were re-indexed;
+    a table whose extraction fails keeps its old chunks.
+    """
+    collection = f"schema_{DB_LABEL}"
+    metas = {t["TABLE_NAME"]: t for t in list_tables()} if tables else {}
+    docs, cols_by_table = [], {}
+    for name in tables:
+        meta = metas.get(name)
+        if meta is None:
+            continue  # dropped between the poll and now
+        try:
+            cols = get_columns(name)
+            docs.append(build_table_doc(meta, sample_n, cols=cols, fks=get_foreign_keys(name), idxs=get_indexes(name)))
+        except Exception as e:
+            print(f"⚠️ Re-extract failed for {name}: {e}")
+            continue
+        cols_by_table[name] = cols
+
+    # Write first: if this raises, the index still serves the previous docs
+    upsert_table_docs(docs, collection_name=collection, processes=1)  # small batches: no worker pool
+    delete_stale_docs({d["table"]: d["schema_hash"] for d in docs}, collection)
+    delete_table_docs(removed, collection)
+
+    if STATS_ENABLED:
+        if removed:
+            forget_tables(removed)
+        if cols_by_table:
+            update_stats(engine, dialect, [metas[n] for n in cols_by_table], cols_by_table,
+                         dialect.default_schema(engine), prune=False)
+    return list(cols_by_table)
+
+
+def check_once(sample_n: int = 5) -> Dict:
+    """One poll: diff fingerprints, re-index what changed, persist the new snapshot."""
+    new = current_fingerprints()
+    old = load_snapshot()
+    if old is None:
+        # First run: assume the index matches the live schema (e.g. right after --build)
+        save_snapshot(new)
+        print(f"📸 Schema snapshot created ({len(new)} tables).")
+        return {"added": [], "changed": [], "removed": []}
+
+    added, changed, removed = diff(old, new)
+    if added or changed or removed:
+        print(f"🔄 Schema change: +{len(added)} ~{len(changed)} -{len(removed)} "
+              f"(added={added[:5]} changed={changed[:5]} removed={removed[:5]})")
+        done = set(reindex_tables(added + changed, removed, sample_n))
+        # Tables that failed keep their old fingerprint (or stay unknown) so the next poll retries them
+        snapshot = dict(new)
+        for t in added + changed:
+            if t in done:
+                continue
+            if t in old:
+                snapshot[t] = old[t]
+            else:
+                snapshot.pop(t)
+        save_snapshot(snapshot)
+    return {"added": added, "changed": changed, "removed": removed}
+
+
+def run_watcher(interval: float = WATCH_INTERVAL, sample_n: int = 5, stop: threading.Event = None):
+    stop = stop or threading.Event()
+    interval = interval or 60
+    print(f"👀 Watching schema '{DB_LABEL}' every {interval:.0f}s")
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            check_once(sample_n)
+        except Exception as e:
+            print(f"⚠️ Schema watch failed: {e}")
+        stop.wait(max(0.0, interval - (time.perf_counter() - t0)))
+
+
+def start_watcher(interval: float = WATCH_INTERVAL, sample_n: int = 5) -> threading.Event:
+    """Runs the watcher in a daemon thread; set the returned event to stop it."""
+    stop = threading.Event()
+    threading.Thread(target=run_watcher, args=(interval, sample_n, stop), name="schema-watcher", daemon=True).start()
+    return stop
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll the database schema and re-index changed tables")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL or 60)
+    parser.add_argument("--sample_n", type=int, default=5)
+    parser.add_argument("--once", action="store_true", help="Run a single check and exit")
+    args = parser.parse_args()
+
+    if args.once:
+        print(check_once(args.sample_n))
+    else:
+        run_watcher(args.interval, args.sample_n)
@@ -0,0 +1,155 @@
+# src/server.py
+import argparse
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from src.config import SERVER_WORKERS, SERVER_MAX_QUEUE, SERVER_QUEUE_TIMEOUT, METRICS_PORT, WATCH_INTERVAL
+from src.embeddings_client import embed_texts
+from src.rag_query import question_to_sql_and_execute
+from src.run_full_pipeline import safe_json
+from src.schema_watcher import start_watcher
+from src.sql_executor import engine
+from src import tracing
+
+# ---------------------------------------------------------------------
+# Long-running ASGI service around question_to_sql_and_execute.
+# Importing this module loads the embedding model, Chroma client and DB
+# engines once; requests then reuse them.
+#
+#   uvicorn src.server:app --port 8000      (or: python -m src.server)
+# ---------------------------------------------------------------------
+# The pipeline is blocking (model, Chroma, DB driver): run it on a bounded pool.
+_executor = ThreadPoolExecutor(max_workers=SERVER_WORKERS, thread_name_prefix="nl2sql")
+_slots = None          # asyncio.Semaphore(SERVER_WORKERS), created lazily on the running loop
+_waiting = 0           # admitted requests not yet holding a slot
+_inflight: Dict[tuple, asyncio.Task] = {}
+
+
+class QueryRequest(BaseModel):
+    question: str
+    run_query: bool = True
+    stream: bool = False
+
+
+def _coalesce_key(question: str, run_query: bool) -> tuple:
+    # whitespace only: case can matter inside literals ('ACME' vs 'acme')
+    return (" ".join(question.split()), run_query)
+
+
+def _serialize(out: dict) -> dict:
+    return {
+        "sql": out["sql"],
+        "rows": out["rows"],
+        "tables": [d["metadata"].get("table") for d in out.get("sources") or []],
+    }
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(SERVER_WORKERS)
+    return _slots
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    loop = asyncio.get_running_loop()
+    # First encode and first connection are the slow ones; pay for them now.
+    await loop.run_in_executor(_executor, embed_texts, ["warm up"])
+    await loop.run_in_executor(_executor, lambda: engine.connect().close())
+    tracing.start_metrics_server(METRICS_PORT)
+    watcher = start_watcher(WATCH_INTERVAL) if WATCH_INTERVAL > 0 else None
+    print(f"🚀 NL2SQL server ready ({SERVER_WORKERS} workers, queue {SERVER_MAX_QUEUE}).")
+    yield
+    if watcher is not None:
+        watcher.set()
+
+
+app = FastAPI(title="NL2SQL RAG Chatbot", lifespan=_lifespan)
+
+
+async def _run_admitted(question: str, run_query: bool) -> dict:
+    """Waits for a worker slot (bounded queue + timeout) and runs the pipeline."""
+    global _waiting
+    if _waiting >= SERVER_MAX_QUEUE:
+        tracing.incr("requests_rejected", reason="queue_full")
+        raise HTTPException(503, "Server busy, try again later.", headers={"Retry-After": "1"})
+
+    _waiting += 1
+    try:
+        await asyncio.wait_for(_get_slots().acquire(), timeout=SERVER_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        tracing.incr("requests_rejected", reason="queue_timeout")
+        raise HTTPException(503, "Timed out waiting for a worker.", headers={"Retry-After": "5"})
+    finally:
+        _waiting -= 1
+
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, question_to_sql_and_execute, question, run_query)
+    finally:
+        _get_slots().release()
+
+
+async def answer(question: str, run_query: bool = True) -> dict:
+    """Identical in-flight questions share one pipeline run (and so one LLM call)."""
+    key = _coalesce_key(question, run_query)
+    task = _inflight.get(key)
+    if task is not None:
+        tracing.incr("requests_coalesced")
+    else:
+        task = asyncio.ensure_future(_run_admitted(question, run_query))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shield: one cancelled client must not cancel the run for the others
+    return await asyncio.shield(task)
+
+
+def _ndjson(out: dict, batch: int = 100):
+    head = _serialize(out)
+    rows = head.pop("rows") or []
+    yield json.dumps({**head, "row_count": len(rows)}, default=safe_json) + "\n"
+    for i in range(0, len(rows), batch):
+        yield "".join(json.dumps(r, default=safe_json) + "\n" for r in rows[i:i + batch])
+    yield json.dumps({"done": True}) + "\n"
+
+
+@app.post("/query")
+async def query(req: QueryRequest):
+    if not req.question.strip():
+        raise HTTPException(400, "Empty question.")
+    try:
+        out = await answer(req.question, req.run_query)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+    except Exception as e:
+        raise HTTPException(500, f"{type(e).__name__}: {e}")
+
+    if req.stream:
+        return StreamingResponse(_ndjson(out), media_type="application/x-ndjson")
+    with tracing.span("serialization"):
+        body = json.dumps(_serialize(out), default=safe_json)
+    return Response(body, media_type="application/json")
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok", "inflight": len(_inflight), "waiting": _waiting}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="NL2SQL HTTP server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    # a single process keeps one warm model; scale with SERVER_WORKERS threads
+    uvicorn.run(app, host=args.host, port=args.port)
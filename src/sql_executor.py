@@ -3,10 +3,13 @@ from sqlalchemy import create_engine, text
 from src.config import DB_URI
 import re
 from sqlalchemy.exc import SQLAlchemyError
+from src import tracing
+from src.dialects import get_dialect
 
 RO_SCHEMA = DB_URI  # For prod use a read-only user/replica
 
 engine = create_engine(RO_SCHEMA, pool_pre_ping=True, future=True)
+dialect = get_dialect(engine)
 
 SELECT_RE = re.compile(r"^\s*SELECT\s", re.IGNORECASE)
 
@@ -22,7 +25,7 @@ SELECT_RE = re.compile(r"^\s*SELECT\s", re.IGNORECASE)
 def safe_prepare_query(sql: str, limit: int = 1000) -> str:
     """
     Ensures only safe SELECT queries are executed.
-    Adds a LIMIT if not present.
+    Adds a dialect-appropriate row limit if not present.
     """
     sql_clean = sql.strip().strip("`").strip(";")
     sql_clean = sql_clean.replace("```", "").replace("SQL", "").replace("sql", "").strip()
@@ -38,20 +41,20 @@ def safe_prepare_query(sql: str, limit: int = 1000) -> str:
     if not sql_clean.lower().startswith("select"):
         raise ValueError("Only SELECT queries allowed in safe executor.")
 
-    # Ensure LIMIT is present
-    if "limit" not in lower_sql:
-        sql_clean = sql_clean.rstrip(";") + f" LIMIT {limit};"
-
-    return sql_clean
+    # Ensure a row limit is present
+    return dialect.apply_limit(sql_clean, limit)
 
 
 def run_select(sql: str, limit: int = 1000):
-    q = safe_prepare_query(sql, limit)
+    with tracing.span("sql_validation"):
+        q = safe_prepare_query(sql, limit)
     try:
-        with engine.connect() as conn:
-            q = q.replace("```sql", "").replace("```", "").replace("---", "").strip() #added new 
-            res = conn.execute(text(q))
-            rows = [dict(r) for r in res.mappings().all()]
+        with tracing.span("db_execution") as sp:
+            with engine.connect() as conn:
+                q = q.replace("```sql", "").replace("```", "").replace("---", "").strip() #added new 
+                res = conn.execute(text(q))
+                rows = [dict(r) for r in res.mappings().all()]
+            sp.set("db.rows", len(rows))
         return rows
     except SQLAlchemyError as e:
         raise RuntimeError(f"Query failed: {e}")
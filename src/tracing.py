@@ -0,0 +1,201 @@
+# src/tracing.py
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict
+from src.config import TRACING_BACKEND, METRICS_PORT
+
+# ---------------------------------------------------------------------
+# Backend selection (TRACING_BACKEND=none|local|prometheus|otel, comma-separated)
+#   local      -> in-process reservoirs, see stage_percentiles()/counters()
+#   prometheus -> nl2sql_stage_seconds histogram + nl2sql_*_total counters
+#   otel       -> one OpenTelemetry span per stage
+# With "none" and no active collect() block, span() returns a shared no-op.
+# ---------------------------------------------------------------------
+BACKENDS = {b.strip() for b in TRACING_BACKEND.lower().split(",") if b.strip() and b.strip() != "none"}
+
+_current_timings: ContextVar = ContextVar("nl2sql_timings", default=None)
+
+_local_stages = defaultdict(lambda: deque(maxlen=10000))
+_local_counters = defaultdict(float)
+
+_prom_hist = None
+_prom_counters = {}
+_otel_tracer = None
+
+if "prometheus" in BACKENDS:
+    try:
+        from prometheus_client import Histogram, Counter
+        _prom_hist = Histogram(
+            "nl2sql_stage_seconds", "Latency of each NL2SQL pipeline stage", ["stage"],
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+        )
+    except ImportError:
+        print("⚠️ prometheus_client not installed; prometheus backend disabled.")
+        BACKENDS.discard("prometheus")
+
+if "otel" in BACKENDS:
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        # Respect a provider configured by opentelemetry-instrument; otherwise export via OTLP
+        # (endpoint from OTEL_EXPORTER_OTLP_ENDPOINT).
+        if not isinstance(trace.get_tracer_provider(), TracerProvider):
+            provider = TracerProvider()
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            trace.set_tracer_provider(provider)
+        _otel_tracer = trace.get_tracer("nl2sql")
+    except ImportError:
+        print("⚠️ opentelemetry sdk/exporter not installed; otel backend disabled.")
+        BACKENDS.discard("otel")
+
+
+# ---------------------------------------------------------------------
+# Spans
+# ---------------------------------------------------------------------
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, key, value):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("name", "timings", "_t0", "_otel_cm", "_otel_span")
+
+    def __init__(self, name: str, timings: Dict, attrs: Dict):
+        self.name = name
+        self.timings = timings
+        self._otel_cm = None
+        self._otel_span = None
+        if _otel_tracer is not None:
+            self._otel_cm = _otel_tracer.start_as_current_span(name, attributes=attrs or None)
+
+    def __enter__(self):
+        if self._otel_cm is not None:
+            self._otel_span = self._otel_cm.__enter__()
+        self._t0 = time.perf_counter()
+        return self
+
+    def set(self, key, value):
+        """Attach an attribute (e.g. token counts) to the span."""
+        if self._otel_span is not None:
+            self._otel_span.set_attribute(key, value)
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._t0
+        if self.timings is not None:
+            # stages may run more than once per request (e.g. two vector queries)
+            self.timings[self.name] = round(self.timings.get(self.name, 0.0) + elapsed, 6)
+        if _prom_hist is not None:
+            _prom_hist.labels(stage=self.name).observe(elapsed)
+        if "local" in BACKENDS:
+            _local_stages[self.name].append(elapsed)
+        if exc_type is not None:
+            incr("stage_errors", stage=self.name)
+        if self._otel_cm is not None:
+            return self._otel_cm.__exit__(exc_type, exc, tb)
+        return False
+
+
+def span(name: str, **attrs):
+    """
+    Times one pipeline stage. Durations go to every enabled backend and,
+    inside a collect() block, into that block's timings dict.
+    """
+    timings = _current_timings.get()
+    if timings is None and not BACKENDS:
+        return _NOOP
+    return Span(name, timings, attrs)
+
+
+@contextmanager
+def collect(timings: Dict):
+    """Collects stage durations of the enclosed spans into `timings`."""
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+# ---------------------------------------------------------------------
+# Counters (cache hits, retries, tokens, ...)
+# ---------------------------------------------------------------------
+def incr(name: str, value: float = 1, **labels):
+    if not BACKENDS:
+        return
+    if "local" in BACKENDS:
+        key = name if not labels else f"{name}{{{','.join(f'{k}={v}' for k, v in sorted(labels.items()))}}}"
+        _local_counters[key] += value
+    if "prometheus" in BACKENDS:
+        counter = _prom_counters.get(name)
+        if counter is None:
+            counter = Counter(f"nl2sql_{name}_total", f"NL2SQL counter: {name}", sorted(labels))
+            _prom_counters[name] = counter
+        (counter.labels(**labels) if labels else counter).inc(value)
+    if _otel_tracer is not None:
+        current = trace.get_current_span()
+        if current.is_recording():
+            current.add_event(name, attributes={"value": value, **labels})
+
+
+# ---------------------------------------------------------------------
+# Reporting / export
+# ---------------------------------------------------------------------
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of `values` (0.0 when empty)."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def stage_percentiles() -> Dict:
+    """p50/p90/p99 per stage from the local backend (seconds)."""
+    return {
+        stage: {
+            "p50": percentile(v, 50),
+            "p90": percentile(v, 90),
+            "p99": percentile(v, 99),
+            "n": len(v),
+        }
+        for stage, v in _local_stages.items()
+    }
+
+
+def stage_total(name: str) -> float:
+    """Total seconds recorded for one stage by the local backend."""
+    return sum(_local_stages.get(name, ()))
+
+
+def counters() -> Dict:
+    return dict(_local_counters)
+
+
+def reset_local():
+    _local_stages.clear()
+    _local_counters.clear()
+
+
+def start_metrics_server(port: int = METRICS_PORT):
+    """Exposes /metrics for Prometheus scraping (no-op unless the backend is enabled)."""
+    if "prometheus" not in BACKENDS:
+        return False
+    from prometheus_client import start_http_server
+    start_http_server(port)
+    print(f"📈 Prometheus metrics on :{port}/metrics")
+    return True
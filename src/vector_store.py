@@ -1,11 +1,12 @@
 # src/vector_store.py
-import os
-import time
-from typing import List, Dict
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Tuple
 import chromadb
 from chromadb import PersistentClient
-from src.config import CHROMA_DIR, EMBED_BATCH
-from src.embeddings_client import embed_texts
+from src.config import CHROMA_DIR, DB_LABEL, UPSERT_CHUNK, EMBED_PROCESSES
+from src.embeddings_client import embed_texts, embed_documents, stop_pool
+from src import tracing
 
 # ---------------------------------------------------------------------
 # Initialize Chroma persistent client
@@ -24,17 +25,66 @@ def chunk_text(text: str, max_chars: int = 2000) -> List[str]:
     return chunks
 
 
+# ---------------------------------------------------------------------
+# Index build helpers
+# ---------------------------------------------------------------------
+def _iter_chunks(table_docs: List[Dict]) -> Iterator[Tuple[str, Dict, str]]:
+    """Flatten each table into (id, metadata, text) chunks, lazily."""
+    for td in table_docs:
+        base_meta = {
+            "table": td["table"],
+            "db": td["db"],
+            "schema_hash": td["schema_hash"],
+            "created_at": td["created_at"]
+        }
+        for i, c in enumerate(chunk_text(td["text"], max_chars=2000)):
+            doc_id = f"{td['db']}::{td['table']}::chunk{i}::{td['schema_hash'][:8]}"
+            yield doc_id, {**base_meta, "chunk_index": i}, c
+
+
+def _windows(chunks: Iterator[Tuple[str, Dict, str]], size: int):
+    ids, metadatas, documents = [], [], []
+    for doc_id, meta, text in chunks:
+        ids.append(doc_id)
+        metadatas.append(meta)
+        documents.append(text)
+        if len(ids) >= size:
+            yield ids, metadatas, documents
+            ids, metadatas, documents = [], [], []
+    if ids:
+        yield ids, metadatas, documents
+
+
+def _write_window(col, ids, metadatas, documents, embeddings):
+    with tracing.span("index_write"):
+        col.upsert(ids=ids, metadatas=metadatas, documents=documents, embeddings=embeddings.tolist())
+
+
+def _wait_for_writer(pending):
+    """Back-pressure: encoding pauses only while the previous window is still being written."""
+    if pending is None:
+        return
+    if not pending.done():
+        tracing.incr("index_write_waits")
+        with tracing.span("index_backpressure"):
+            pending.result()
+    else:
+        pending.result()
+
+
 # ---------------------------------------------------------------------
 # Upsert (insert/update) schema docs into vector store
 # ---------------------------------------------------------------------
-def upsert_table_docs(table_docs: List[Dict], collection_name: str = None):
+def upsert_table_docs(table_docs: List[Dict], collection_name: str = None, processes: int = EMBED_PROCESSES):
     """
     Upserts schema table documentation (text + metadata) into Chroma vector DB.
-    Automatically handles embeddings via `embed_texts`.
+    Chunks are embedded with `embed_documents` (multi-process when
+    processes > 1) and written in UPSERT_CHUNK windows.
 
     Args:
         table_docs: list of dicts from schema_fetcher.extract_all()
-        collection_name: override for Chroma collection (default: schema_<DB_NAME>)
+        collection_name: override for Chroma collection (default: schema_<db> from the docs, i.e. DB_LABEL)
+        processes: encoder processes (default EMBED_PROCESSES)
     """
     if not table_docs:
         return {"collection": collection_name, "count": 0}
@@ -51,74 +101,87 @@ def upsert_table_docs(table_docs: List[Dict], collection_name: str = None):
     else:
         col = client.create_collection(name=collection_name)
 
-    ids, metadatas, documents = [], [], []
-
     # -----------------------------------------------------------------
-    # Flatten each table into text chunks with metadata
+    # Pipeline: encode window n+1 while window n is being written.
+    # At most two windows of UPSERT_CHUNK chunks are held in memory.
     # -----------------------------------------------------------------
-    for td in table_docs:
-        base_meta = {
-            "table": td["table"],
-            "db": td["db"],
-            "schema_hash": td["schema_hash"],
-            "created_at": td["created_at"]
-        }
+    count = 0
+    pending = None
+    try:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-write") as writer:
+            for ids, metadatas, documents in _windows(_iter_chunks(table_docs), UPSERT_CHUNK):
+                with tracing.span("index_embed"):
+                    embeddings = embed_documents(documents, processes)
+                _wait_for_writer(pending)
+                # copy_context: index_write timings land in the caller's tracing.collect()
+                pending = writer.submit(
+                    contextvars.copy_context().run, _write_window, col, ids, metadatas, documents, embeddings
+                )
+                count += len(ids)
+            _wait_for_writer(pending)
+    finally:
+        stop_pool()
 
-        chunks = chunk_text(td["text"], max_chars=2000)
-        for i, c in enumerate(chunks):
-            doc_id = f"{td['db']}::{td['table']}::chunk{i}::{td['schema_hash'][:8]}"
-            ids.append(doc_id)
-            metadatas.append({**base_meta, "chunk_index": i})
-            documents.append(c)
+    # client.persist()
 
-    # -----------------------------------------------------------------
-    # Compute embeddings in batches (using your local model)
-    # -----------------------------------------------------------------
-    all_embeddings = []
-    for i in range(0, len(documents), EMBED_BATCH):
-        batch = documents[i:i + EMBED_BATCH]
-        emb = embed_texts(batch)
-        all_embeddings.extend(emb)
-        time.sleep(0.05)  # prevent CPU burst
+    return {"collection": collection_name, "count": count}
 
-    # -----------------------------------------------------------------
-    # Add/update embeddings in vector DB
-    # -----------------------------------------------------------------
-    col.add(
-        documents=documents,
-        metadatas=metadatas,
-        ids=ids,
-        embeddings=all_embeddings
-    )
 
-    # client.persist()
+# ---------------------------------------------------------------------
+# Remove chunks of dropped tables / superseded chunks of re-indexed tables
+# ---------------------------------------------------------------------
+def _existing_collection(collection_name: str):
+    existing_collections = [c.name for c in client.list_collections()]
+    if collection_name not in existing_collections:
+        return None
+    return client.get_collection(collection_name)
 
-    return {"collection": collection_name, "count": len(documents)}
+
+def delete_table_docs(tables: List[str], collection_name: str):
+    col = _existing_collection(collection_name) if tables else None
+    if col is None:
+        return 0
+    col.delete(where={"table": {"$in": list(tables)}})
+    return len(tables)
+
+
+def delete_stale_docs(current: Dict[str, str], collection_name: str):
+    """Deletes chunks of each table in `current` whose schema_hash is not the current one."""
+    col = _existing_collection(collection_name) if current else None
+    if col is None:
+        return 0
+    for table, schema_hash in current.items():
+        col.delete(where={"$and": [{"table": table}, {"schema_hash": {"$ne": schema_hash}}]})
+    return len(current)
 
 
 # ---------------------------------------------------------------------
 # Semantic similarity search (RAG lookup)
 # ---------------------------------------------------------------------
-def similarity_search(query: str, collection_name: str = None, k: int = 4):
+def similarity_search(query: str, collection_name: str = None, k: int = 4, query_embedding: list = None):
     """
     Performs a semantic search in the vector DB to retrieve relevant schema chunks.
 
     Args:
         query: natural language question
-        collection_name: defaults to schema_<DB_NAME>
+        collection_name: defaults to schema_<DB_LABEL>, the collection the build writes
         k: number of top relevant chunks to return
+        query_embedding: precomputed embedding of `query` (skips re-encoding)
     """
-    collection_name = collection_name or f"schema_{os.getenv('DB_NAME')}"
+    collection_name = collection_name or f"schema_{DB_LABEL}"
     col = client.get_collection(collection_name)
 
-    # embed the query using same embedding model
-    q_emb = embed_texts([query])[0]
-
-    results = col.query(
-        query_embeddings=[q_emb],
-        n_results=k,
-        include=["metadatas", "documents"]
-    )
+    # embed the query using same embedding model (unless the caller already did)
+    if query_embedding is None:
+        with tracing.span("embed"):
+            query_embedding = embed_texts([query])[0]
+
+    with tracing.span("vector_query", k=k):
+        results = col.query(
+            query_embeddings=[query_embedding],
+            n_results=k,
+            include=["metadatas", "documents"]
+        )
 
     # Convert Chroma format into list[{"text": str, "metadata": dict}]
     out = []